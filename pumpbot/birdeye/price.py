@@ -1,16 +1,105 @@
-from typing import Optional
+import asyncio
+from typing import Dict, List, Optional
 from pumpbot.util.http import http_get
+from pumpbot.util import jsonfast
 from pumpbot.config import CONFIG,BIRDEYE_API_KEY
+from pumpbot.util.cache import MISS, get_cache
+from pumpbot.util.lifecycle import on_shutdown
+
+
+class PriceTicker:
+    """
+    跨 mint 合并价格请求：一个 tick（PRICE_BATCH_WINDOW_MS）内所有没命中的 mint
+    一起走 /defi/multi_price（≤ PRICE_BATCH_MAX 个一组），结果写进共享的短 TTL 价格表（"birdeye_price" 缓存）。
+      price = await ticker.price(mint)    # 命中价格表直接返回，否则等下一个 tick
+      ticker.peek(mint)                   # 只读价格表，不发请求（过期 / 没有返回 None）
+    """
+
+    def __init__(self, batch_max: int, window_sec: float):
+        self.batch_max = batch_max
+        self.window = window_sec
+        self.table = get_cache("birdeye_price")
+        self._pending: Dict[str, List[asyncio.Future]] = {}
+        self._driver: Optional[asyncio.Task] = None
+        self.counters: Dict[str, int] = {"requests": 0, "failed": 0, "lookups": 0, "priced": 0}
+
+    def peek(self, mint: str) -> Optional[float]:
+        v = self.table.get(mint)
+        return None if v is MISS else v
+
+    async def price(self, mint: str) -> Optional[float]:
+        v = self.table.get(mint)
+        if v is not MISS:
+            return v
+        fut = asyncio.get_running_loop().create_future()
+        self._pending.setdefault(mint, []).append(fut)
+        if self._driver is None or self._driver.done():
+            self._driver = asyncio.create_task(self._run())
+        # shield：某个调用方被取消不影响同一批里的其它 mint
+        return await asyncio.shield(fut)
+
+    async def _run(self):
+        while self._pending:
+            await asyncio.sleep(self.window)
+            batch, self._pending = self._pending, {}
+            mints = list(batch)
+            chunks = [mints[i:i + self.batch_max] for i in range(0, len(mints), self.batch_max)]
+            self.counters["requests"] += len(chunks)
+            self.counters["lookups"] += len(mints)
+            prices: Dict[str, Optional[float]] = {}
+            for res in await asyncio.gather(*(self._fetch(c) for c in chunks), return_exceptions=True):
+                if isinstance(res, Exception):
+                    self.counters["failed"] += 1
+                    print(f"[birdeye] multi_price failed: {res}")
+                    continue
+                prices.update(res)
+            for mint, futs in batch.items():
+                p = prices.get(mint)
+                # 只缓存真正拿到结果的 mint；请求失败的这次返回 None，但不写进价格表，下次调用会重新查
+                if mint in prices:
+                    self.table.set(mint, p)
+                self.counters["priced"] += p is not None
+                for f in futs:
+                    if not f.done():
+                        f.set_result(p)
+
+    async def _fetch(self, mints: List[str]) -> Dict[str, Optional[float]]:
+        url = f"{CONFIG['BIRDEYE_API']}/defi/multi_price"
+        headers = {"X-API-KEY": BIRDEYE_API_KEY, "x-chain": "solana"}
+        r = await http_get(url, headers=headers, params={"list_address": ",".join(mints)}, timeout=CONFIG["PRICE_TIMEOUT"])
+        if r.status_code != 200:
+            raise RuntimeError(f"HTTP {r.status_code}")
+        data = jsonfast.loads(r.content).get("data") or {}
+        out: Dict[str, Optional[float]] = {}
+        for mint in mints:
+            value = (data.get(mint) or {}).get("value")
+            out[mint] = float(value) if value else None
+        return out
+
+    async def close(self):
+        if self._driver is not None:
+            self._driver.cancel()
+            await asyncio.gather(self._driver, return_exceptions=True)
+            self._driver = None
+        for futs in self._pending.values():
+            for f in futs:
+                if not f.done():
+                    f.set_result(None)
+        self._pending.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {**self.counters, "pending": len(self._pending), **self.table.stats()}
+
+
+ticker = PriceTicker(CONFIG["PRICE_BATCH_MAX"], CONFIG["PRICE_BATCH_WINDOW_MS"] / 1000)
+
+
+@on_shutdown
+async def close_ticker():
+    await ticker.close()
 
 
 async def get_birdeye_price_usd(mint: str) -> Optional[float]:
     if not BIRDEYE_API_KEY:
         return None
-    
-    url = f"{CONFIG['BIRDEYE_API']}/defi/v3/token/market-data?address={mint}"
-    headers = {"X-API-KEY": BIRDEYE_API_KEY}
-    r = await http_get(url, headers=headers, timeout=CONFIG["PRICE_TIMEOUT"])
-    if r.status_code != 200:
-        return None
-    price = (r.json().get("data") or {}).get("price")
-    return float(price) if price else None
+    return await ticker.price(mint)
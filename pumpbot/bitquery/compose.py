@@ -0,0 +1,112 @@
+# pumpbot/bitquery/compose.py
+# 把多个指标（可以是多个 mint）的查询块合成一个 GraphQL 文档，一次请求拿回来再按指标拆开。
+# 每个块的根字段别名和变量名都加上 "q<i>_" 前缀，互不冲突；某个块出错只影响它自己。
+import re
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from pumpbot.bitquery.eap import BITQUERY_ENDPOINT, BitqueryError, post_query
+from pumpbot.util import jsonfast
+
+_ALIAS = re.compile(r"\b__(\w+)\s*:")
+_VAR = re.compile(r"\$(\w+)")
+
+
+@dataclass(frozen=True)
+class Metric:
+    """
+    body 是 Solana { ... } 里面的部分：根字段写成 __alias: Field(...)，变量照常写 $name。
+    parse 拿到 {alias: 该字段的结果}（别名不带前缀），返回这个指标的值。
+    """
+    name: str
+    body: str
+    var_types: Dict[str, str]
+    parse: Callable[[Dict[str, Any]], Any]
+
+    def aliases(self) -> List[str]:
+        return _ALIAS.findall(self.body)
+
+
+class Query:
+    """
+    q = Query()
+    fees = q.add(FEES, addr=mint, tips=tips)
+    born = q.add(CREATION, addr=mint)
+    res = await q.run()        # {fees: ..., born: ...}；失败的块对应的值是 BitqueryError
+    """
+
+    def __init__(self):
+        self._parts: List[Tuple[str, Metric, Dict[str, Any]]] = []
+
+    def add(self, metric: Metric, **variables) -> str:
+        missing = set(metric.var_types) - set(variables)
+        if missing:
+            raise ValueError(f"{metric.name}: missing variables {sorted(missing)}")
+        key = f"q{len(self._parts)}_"
+        self._parts.append((key, metric, variables))
+        return key
+
+    def __len__(self) -> int:
+        return len(self._parts)
+
+    def document(self) -> Tuple[str, Dict[str, Any]]:
+        decls: List[str] = []
+        bodies: List[str] = []
+        variables: Dict[str, Any] = {}
+        for key, metric, vs in self._parts:
+            for name, tp in metric.var_types.items():
+                decls.append(f"${key}{name}: {tp}")
+                variables[key + name] = vs[name]
+            body = _ALIAS.sub(lambda m: f"{key}{m.group(1)}:", metric.body)
+            body = _VAR.sub(lambda m: f"${key}{m.group(1)}" if m.group(1) in metric.var_types else m.group(0), body)
+            bodies.append(body)
+        head = f"query ({', '.join(decls)})" if decls else "query"
+        return head + " {\n  Solana {\n" + "\n".join(bodies) + "\n  }\n}\n", variables
+
+    async def run(self, timeout: float = 45, api_key: Optional[str] = None, endpoint: str = BITQUERY_ENDPOINT) -> Dict[str, Any]:
+        if not self._parts:
+            return {}
+        doc, variables = self.document()
+        try:
+            j = jsonfast.loads(await post_query(doc, variables, timeout, api_key, endpoint))
+        except (BitqueryError, jsonfast.DecodeError, httpx.HTTPError, asyncio.TimeoutError) as e:
+            # 网络 / 超时也按“所有块失败”返回，调用方各自回退，不把异常抛给上层任务
+            msg = str(e) or type(e).__name__
+            return {key: BitqueryError(msg) for key, _, _ in self._parts}
+
+        sol = (j.get("data") or {}).get("Solana") or {}
+        # GraphQL 错误带 path，["Solana", "q1_trades", ...] → 只算 q1_ 这个块失败；没有 path 的算全部失败
+        failed: Dict[str, str] = {}
+        for err in j.get("errors") or []:
+            path = err.get("path") if isinstance(err, dict) else None
+            field = path[1] if isinstance(path, list) and len(path) > 1 else None
+            msg = str(err.get("message") if isinstance(err, dict) else err)[:300]
+            for key, _, _ in self._parts:
+                if field is None or str(field).startswith(key):
+                    failed.setdefault(key, msg)
+
+        out: Dict[str, Any] = {}
+        for key, metric, _ in self._parts:
+            if key in failed:
+                out[key] = BitqueryError(failed[key])
+                continue
+            try:
+                out[key] = metric.parse({a: sol.get(key + a) for a in metric.aliases()})
+            except Exception as e:
+                out[key] = BitqueryError(f"{metric.name}: {e}")
+        return out
+
+
+async def run_one(
+    metric: Metric, timeout: float = 45, api_key: Optional[str] = None, endpoint: str = BITQUERY_ENDPOINT, **variables,
+) -> Any:
+    """单个指标的便捷入口；出错抛 BitqueryError。"""
+    q = Query()
+    key = q.add(metric, **variables)
+    res = (await q.run(timeout, api_key, endpoint))[key]
+    if isinstance(res, BitqueryError):
+        raise res
+    return res
@@ -0,0 +1,148 @@
+# pumpbot/bitquery/eap.py
+# Bitquery EAP 客户端：按 slot 游标分页拉行，每页解码完就交给调用方，
+# 同时已经在请求下一页 —— 单页内存有上限，第一页到了就能开始算，某一页失败只重试那一页。
+import asyncio
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
+
+import httpx
+
+from pumpbot.config import BITQUERY_API_KEY, CONFIG
+from pumpbot.util import jsonfast
+from pumpbot.util.http import http_post
+
+BITQUERY_ENDPOINT = "https://streaming.bitquery.io/eap"
+BITQUERY_GRAPHQL = "https://streaming.bitquery.io/graphql"    # 非 EAP（历史数据）
+
+
+class BitqueryError(Exception):
+    pass
+
+
+# 分页查询的行：只解 Slot / Signer / Signature，其它字段解码时跳过
+@dataclass
+class BqBlock:
+    Slot: Union[int, str, None] = None
+
+
+@dataclass
+class BqTx:
+    Signer: Optional[str] = None
+    Signature: Optional[str] = None
+
+
+@dataclass
+class BqRow:
+    Block: Optional[BqBlock] = None
+    Transaction: Optional[BqTx] = None
+
+
+@dataclass
+class _PageSolana:
+    rows: Optional[List[BqRow]] = None
+
+
+@dataclass
+class _PageData:
+    Solana: Optional[_PageSolana] = None
+
+
+@dataclass
+class _PageResponse:
+    data: Optional[_PageData] = None
+    errors: Any = None
+
+
+def row_slot(row: BqRow) -> Optional[int]:
+    try:
+        return int(str(row.Block.Slot))
+    except Exception:
+        return None
+
+
+async def post_query(
+    query: str, variables: Dict[str, Any], timeout: float = 45, api_key: Optional[str] = None,
+    endpoint: str = BITQUERY_ENDPOINT,
+) -> bytes:
+    """发一个 GraphQL 请求，返回原始 body（交给 jsonfast 按需解码）；HTTP 非 200 抛 BitqueryError。"""
+    api_key = api_key or BITQUERY_API_KEY
+    if not api_key:
+        raise BitqueryError("BITQUERY_API_KEY not set")
+    headers = {"Content-Type": "application/json", "Authorization": f"Bearer {api_key}"}
+    r = await http_post(endpoint, json={"query": query, "variables": variables}, headers=headers, timeout=timeout)
+    if r.status_code != 200:
+        raise BitqueryError(f"HTTP {r.status_code}: {r.text[:300]}")
+    return r.content
+
+
+async def _page(query: str, variables: Dict[str, Any], after: int, limit: int) -> List[BqRow]:
+    err: Optional[Exception] = None
+    for attempt in range(CONFIG["BITQUERY_PAGE_RETRIES"]):
+        if attempt:
+            await asyncio.sleep(2 ** (attempt - 1))
+        try:
+            body = await post_query(query, {**variables, "after": after, "limit": limit}, CONFIG["BITQUERY_PAGE_TIMEOUT"])
+            page = jsonfast.decode(body, _PageResponse)
+        except (BitqueryError, httpx.HTTPError, jsonfast.DecodeError) as e:
+            err = e
+            continue
+        if page.errors:
+            raise BitqueryError(str(page.errors)[:300])
+        sol = page.data.Solana if page.data else None
+        return (sol.rows if sol else None) or []
+    raise BitqueryError(f"page after slot {after} failed: {err}")
+
+
+async def iter_slot_pages(
+    query: str,
+    variables: Dict[str, Any],
+    *,
+    after: int = 0,
+    page_size: Optional[int] = None,
+    max_rows: Optional[int] = None,
+    first: Optional[List[BqRow]] = None,
+) -> AsyncIterator[List[BqRow]]:
+    """
+    async for rows in iter_slot_pages(QUERY, {"token": mint}): ...
+
+    query 要求：变量 $after: Int! / $limit: Int!，唯一的根字段别名为 rows，
+    条件里有 Block: {Slot: {gt: $after}}，orderBy ascending Block_Slot，limit count $limit。
+    满页时最后一个 slot 可能被截断，这部分行留到下一页（游标 = 上一个完整 slot），所以不会丢行也不会重复。
+    first: 第一页已经拿到了（比如在合并查询里，limit 同为 page_size），直接从它开始。
+    """
+    page_size = page_size or CONFIG["BITQUERY_PAGE_SIZE"]
+    max_rows = max_rows or CONFIG["BITQUERY_MAX_ROWS"]
+    total = 0
+    nxt: Optional[asyncio.Task] = None
+    if first is None:
+        nxt = asyncio.create_task(_page(query, variables, after, page_size))
+    try:
+        while first is not None or nxt is not None:
+            if first is not None:
+                page, first = first, None
+            else:
+                page, nxt = await nxt, None
+            rows = [r for r in page if row_slot(r) is not None]
+            if not rows:
+                return
+            if len(page) >= page_size:
+                last = row_slot(rows[-1])
+                cut = len(rows)
+                while cut and row_slot(rows[cut - 1]) == last:
+                    cut -= 1
+                if cut:
+                    rows = rows[:cut]
+                else:
+                    print(f"[bitquery] slot {last} alone fills a page of {page_size}; rest of that slot is skipped")
+                after = row_slot(rows[-1])
+                if total + len(rows) < max_rows:
+                    # 下一页在调用方处理这一页时就开始拉
+                    nxt = asyncio.create_task(_page(query, variables, after, page_size))
+                else:
+                    print(f"[bitquery] stopped at {max_rows} rows (BITQUERY_MAX_ROWS), after slot {after}")
+            total += len(rows)
+            yield rows
+    finally:
+        if nxt is not None:
+            nxt.cancel()
+            await asyncio.gather(nxt, return_exceptions=True)
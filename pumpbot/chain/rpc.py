@@ -1,22 +1,277 @@
-import httpx
+import time
+import asyncio
+import itertools
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, List, Sequence, Tuple
 from solana.rpc.async_api import AsyncClient
-from pumpbot.config import RPC_URL, CONFIG
+from pumpbot.config import RPC_URL, RPC_URLS, CONFIG
+from pumpbot.util.http import http_post
+from pumpbot.util import jsonfast
+from pumpbot.util.lifecycle import on_shutdown
+from pumpbot.util import ratelimit
 
 
-def get_client() -> AsyncClient:
-    return AsyncClient(RPC_URL, commitment="confirmed")
+class _ClientPool:
+    """
+    按 (endpoint, commitment) 复用 AsyncClient（各自持有 keep-alive 连接）。
+    每个 key 最多 size 个 client，取当前借出最少的那个；退出时统一关闭。
+    """
+
+    def __init__(self, size: int):
+        self.size = max(1, size)
+        self._clients: Dict[Tuple[str, str], List[AsyncClient]] = {}
+        self._busy: Dict[int, int] = {}
+
+    def get(self, endpoint: str | None = None, commitment: str = "confirmed") -> AsyncClient:
+        clients = self._clients.setdefault((endpoint or RPC_URL, commitment), [])
+        idle = [c for c in clients if self._busy[id(c)] == 0]
+        if idle:
+            return idle[0]
+        if len(clients) < self.size:
+            c = AsyncClient(endpoint or RPC_URL, commitment=commitment)
+            clients.append(c)
+            self._busy[id(c)] = 0
+            return c
+        return min(clients, key=lambda c: self._busy[id(c)])
+
+    @asynccontextmanager
+    async def acquire(self, endpoint: str | None = None, commitment: str = "confirmed"):
+        c = self.get(endpoint, commitment)
+        self._busy[id(c)] += 1
+        try:
+            yield c
+        finally:
+            if id(c) in self._busy:
+                self._busy[id(c)] -= 1
+
+    async def close(self):
+        clients = [c for lst in self._clients.values() for c in lst]
+        self._clients.clear()
+        self._busy.clear()
+        for c in clients:
+            await c.close()
+
+
+_pool = _ClientPool(CONFIG["RPC_CLIENT_POOL_SIZE"])
+
+
+def get_client(endpoint: str | None = None, commitment: str = "confirmed") -> AsyncClient:
+    """共享 client，调用方不要 close（退出时由 lifecycle 统一关闭）。"""
+    return _pool.get(endpoint, commitment)
+
+
+def acquire_client(endpoint: str | None = None, commitment: str = "confirmed"):
+    """
+    async with acquire_client() as client:
+        await client.get_token_supply(...)
+    """
+    return _pool.acquire(endpoint, commitment)
+
+
+@on_shutdown
+async def close_clients():
+    await _pool.close()
 
 
 aSYNC_HEADERS = {"Content-Type": "application/json"}
 
 
-async def rpc_call(method: str, params: list):
-    payload = {"jsonrpc": "2.0", "id": 1, "method": method, "params": params}
-    async with httpx.AsyncClient(timeout=CONFIG["HTTP_TIMEOUT"]) as s:
-        r = await s.post(RPC_URL, headers=aSYNC_HEADERS, json=payload)
-    r.raise_for_status()
-    data = r.json()
+def _unwrap(data: dict):
     if "error" in data:
         raise RuntimeError(f"RPC error: {data['error']}")
-    
-    return data["result"]
\ No newline at end of file
+    return data["result"]
+
+
+def _percentile(xs: Sequence[float], q: float) -> float:
+    s = sorted(xs)
+    return s[min(len(s) - 1, int(q * len(s)))]
+
+
+class RpcRouter:
+    """
+    多节点路由：按 (endpoint, method) 记录最近 N 次的延迟和成败，
+    每次调用挑得分最好的节点（延迟 p50 × 错误率惩罚），失败时换下一个节点重试一次。
+    只读方法做 hedge：首选节点超过它自己的 p{RPC_HEDGE_PERCENTILE} 延迟还没回，
+    就向次选节点再发一份，谁先成功用谁，另一个取消。
+    """
+
+    def __init__(self, endpoints: List[str]):
+        self.endpoints = list(dict.fromkeys(endpoints))
+        n = CONFIG["RPC_STATS_WINDOW"]
+        self._lat: Dict[Tuple[str, str], Deque[float]] = {}
+        self._ok: Dict[Tuple[str, str], Deque[bool]] = {}
+        self._new = lambda: (deque(maxlen=n), deque(maxlen=n))
+
+    def _record(self, ep: str, method: str, elapsed: float, ok: bool):
+        key = (ep, method)
+        if key not in self._lat:
+            self._lat[key], self._ok[key] = self._new()
+        self._lat[key].append(elapsed)
+        self._ok[key].append(ok)
+
+    def _score(self, ep: str, method: str) -> float:
+        lat = self._lat.get((ep, method))
+        if not lat:
+            return 0.0  # 没样本的节点先试一次
+        oks = self._ok[(ep, method)]
+        err_rate = 1 - sum(oks) / len(oks)
+        return _percentile(lat, 0.5) * (1 + CONFIG["RPC_ERROR_PENALTY"] * err_rate)
+
+    def ranked(self, method: str) -> List[str]:
+        # sorted 是稳定的：分数相同按配置顺序
+        return sorted(self.endpoints, key=lambda ep: self._score(ep, method))
+
+    def hedge_delay(self, ep: str, method: str) -> float:
+        lat = self._lat.get((ep, method))
+        if not lat or len(lat) < 5:
+            return CONFIG["RPC_HEDGE_DEFAULT_MS"] / 1000
+        return max(CONFIG["RPC_HEDGE_MIN_MS"] / 1000, _percentile(lat, CONFIG["RPC_HEDGE_PERCENTILE"]))
+
+    async def _post_one(self, ep: str, method: str, payload):
+        # 节点按 batch 里的调用条数计费，令牌在这里一次取齐（http 层的 hook 对 RPC host 不再扣）；
+        # 放在计时之前，本地令牌桶排队不算进节点延迟
+        await ratelimit.acquire("rpc", max(1, len(payload)) if isinstance(payload, list) else 1)
+        t0 = time.perf_counter()
+        try:
+            r = await http_post(ep, headers=aSYNC_HEADERS, json=payload, timeout=CONFIG["HTTP_TIMEOUT"])
+            r.raise_for_status()
+            data = jsonfast.loads(r.content)
+        except asyncio.CancelledError:
+            # hedge 输掉被取消：耗时是被截断的，不进延迟样本（否则慢节点的 p50 被拉低、反而更常被选中）
+            raise
+        except Exception:
+            self._record(ep, method, time.perf_counter() - t0, False)
+            raise
+        self._record(ep, method, time.perf_counter() - t0, True)
+        return data
+
+    async def post(self, payload, methods: Sequence[str]):
+        """发送一个 JSON-RPC 请求体（单条或 batch），返回解析后的 JSON。"""
+        method = methods[0] if len(set(methods)) == 1 else "batch"
+        eps = self.ranked(method)
+        if len(eps) == 1:
+            return await self._post_one(eps[0], method, payload)
+
+        if not all(m in CONFIG["RPC_HEDGE_METHODS"] for m in methods):
+            try:
+                return await self._post_one(eps[0], method, payload)
+            except Exception:
+                return await self._post_one(eps[1], method, payload)
+
+        first = asyncio.create_task(self._post_one(eps[0], method, payload))
+        tasks = {first}
+        try:
+            # 等待也放在 try 里：调用方在这期间被取消（batcher / scheduler 超时）时 finally 会取消 first
+            done, _ = await asyncio.wait({first}, timeout=self.hedge_delay(eps[0], method))
+            if done and first.exception() is None:
+                return first.result()
+            tasks = {first} if not done else set()
+            tasks.add(asyncio.create_task(self._post_one(eps[1], method, payload)))
+            err: BaseException | None = None if not done else first.exception()
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for t in done:
+                    if t.exception() is None:
+                        return t.result()
+                    err = t.exception()
+            raise err
+        finally:
+            for t in tasks:
+                t.cancel()
+
+    def stats(self) -> Dict[str, Dict[str, dict]]:
+        out: Dict[str, Dict[str, dict]] = {}
+        for (ep, method), lat in self._lat.items():
+            oks = self._ok[(ep, method)]
+            out.setdefault(ep, {})[method] = {
+                "n": len(lat),
+                "p50_ms": round(_percentile(lat, 0.5) * 1000, 1),
+                "p90_ms": round(_percentile(lat, 0.9) * 1000, 1),
+                "error_rate": round(1 - sum(oks) / len(oks), 3),
+            }
+        return out
+
+
+router = RpcRouter(RPC_URLS)
+
+
+class _RpcBatcher:
+    """
+    把短时间窗口内并发发起的 rpc_call 合并成一个 JSON-RPC batch（数组）发送，
+    再按 id 把结果分发回各自的调用方。
+    - 攒满 max_batch 条立即发送；否则最多等 window_ms 毫秒
+    """
+
+    def __init__(self, max_batch: int, window_ms: float):
+        self.max_batch = max_batch
+        self.window = window_ms / 1000
+        self._ids = itertools.count(1)
+        self._pending: List[Tuple[dict, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._inflight: set[asyncio.Task] = set()
+
+    async def call(self, method: str, params: list):
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        req = {"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": params}
+        self._pending.append((req, fut))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await fut
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        t = asyncio.get_running_loop().create_task(self._send(batch))
+        self._inflight.add(t)
+        t.add_done_callback(self._inflight.discard)
+
+    async def _send(self, batch: List[Tuple[dict, asyncio.Future]]):
+        try:
+            # 单条就不包数组，兼容不支持 batch 的节点
+            payload = batch[0][0] if len(batch) == 1 else [req for req, _ in batch]
+            data = await router.post(payload, [req["method"] for req, _ in batch])
+            if isinstance(data, dict):
+                # 节点对整个 batch 只回了一个错误对象
+                if len(batch) > 1 and data.get("id") is None:
+                    raise RuntimeError(f"RPC error: {data.get('error')}")
+                data = [data]
+            by_id = {d.get("id"): d for d in data if isinstance(d, dict)}
+            for req, fut in batch:
+                if fut.done():
+                    continue
+                d = by_id.get(req["id"])
+                if d is None:
+                    fut.set_exception(RuntimeError(f"RPC batch: no response for {req['method']}"))
+                    continue
+                try:
+                    fut.set_result(_unwrap(d))
+                except RuntimeError as e:
+                    fut.set_exception(e)
+        except Exception as e:
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+
+
+# 一个 batch 要一次拿 len(batch) 个令牌，超过 burst 的 batch 永远要排队，所以不超过 rpc 令牌桶的 burst
+_rpc_bucket = ratelimit.bucket("rpc")
+_batcher = _RpcBatcher(
+    min(CONFIG["RPC_BATCH_MAX"], int(_rpc_bucket.burst)) if _rpc_bucket else CONFIG["RPC_BATCH_MAX"],
+    CONFIG["RPC_BATCH_WINDOW_MS"],
+)
+
+
+async def rpc_call(method: str, params: list):
+    if CONFIG["RPC_BATCH_MAX"] > 1:
+        return await _batcher.call(method, params)
+
+    payload = {"jsonrpc": "2.0", "id": 1, "method": method, "params": params}
+    return _unwrap(await router.post(payload, [method]))
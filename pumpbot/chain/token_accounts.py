@@ -1,5 +1,5 @@
 import base64
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from solders.pubkey import Pubkey
 from pumpbot.config import (
     SYSTEM_PROGRAM_ID,
@@ -7,6 +7,17 @@ from pumpbot.config import (
     INCINERATOR,
 )
 from pumpbot.chain.rpc import rpc_call
+from pumpbot.util.cache import cached
+
+try:
+    import numpy as np  # pip install numpy
+except ImportError:
+    np = None
+
+# SPL token account: mint(0..32) owner(32..64) amount(64..72, u64 LE)；只取 owner + amount
+HOLDER_SLICE = {"offset": 32, "length": 40}
+_SLICE_B64 = 56     # 40 字节的 base64 长度（含 "==" 填充）
+_INCINERATOR_RAW = bytes(Pubkey.from_string(INCINERATOR))
 
 
 async def get_token_accounts_by_mint_all(mint: str, program_id: str,after: Optional[str] = None) -> List[dict]:
@@ -20,6 +31,77 @@ async def get_token_accounts_by_mint_all(mint: str, program_id: str,after: Optio
     return await rpc_call("getProgramAccounts", params)
 
 
+@cached("mint_program")
+async def get_mint_program(mint: str) -> Optional[str]:
+    """mint 账户的 owner：classic SPL 还是 Token-2022（不取数据）。"""
+    info = await rpc_call("getAccountInfo", [mint, {"encoding": "base64", "dataSlice": {"offset": 0, "length": 0}}])
+    return ((info or {}).get("value") or {}).get("owner")
+
+
+async def get_holder_slices(mint: str, program_id: Optional[str] = None) -> List[dict]:
+    """该 mint 的全部 token 账户，每个只带 owner + amount 40 字节（HOLDER_SLICE），不是整 165 字节。"""
+    program_id = program_id or await get_mint_program(mint) or TOKEN_PROGRAM_ID_V1
+    filters = [{"memcmp": {"offset": 0, "bytes": mint}}]
+    if program_id == TOKEN_PROGRAM_ID_V1:
+        filters.insert(0, {"dataSize": 165})
+    params = [program_id, {"encoding": "base64", "filters": filters, "dataSlice": HOLDER_SLICE}]
+    return await rpc_call("getProgramAccounts", params) or []
+
+
+if np is not None:
+    _B64_LUT = np.zeros(256, dtype=np.uint8)
+    _B64_LUT[np.frombuffer(b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/", dtype=np.uint8)] = np.arange(64)
+    # 一个 slice：owner 32 字节 + amount u64 LE
+    SLICE_DTYPE = np.dtype([("owner", "V32"), ("amount", "<u8")])
+
+
+def _b64_block(strs: List[str]) -> "np.ndarray":
+    """
+    n 个 56 字符的 base64 串 → (n, 40) uint8，整块解码，不逐个 b64decode。
+    前 52 个字符正好是 39 字节、没有填充，所有行拼起来一次 b64decode；第 40 个字节由 "xy==" 的 x、y 查表算出。
+    """
+    n = len(strs)
+    chars = np.frombuffer("".join(strs).encode(), dtype=np.uint8).reshape(n, _SLICE_B64)
+    out = np.empty((n, HOLDER_SLICE["length"]), dtype=np.uint8)
+    out[:, :39] = np.frombuffer(base64.b64decode(chars[:, :52].tobytes()), dtype=np.uint8).reshape(n, 39)
+    out[:, 39] = (_B64_LUT[chars[:, 52]] << 2) | (_B64_LUT[chars[:, 53]] >> 4)
+    return out
+
+
+def decode_holder_slices(items: List[dict]) -> "np.ndarray":
+    """getProgramAccounts(dataSlice=HOLDER_SLICE) 的结果 → SLICE_DTYPE 结构数组。"""
+    strs = []
+    odd = []
+    for it in items:
+        b64 = ((it.get("account") or {}).get("data") or [None])[0]
+        if not b64:
+            continue
+        (strs if len(b64) == _SLICE_B64 else odd).append(b64)
+    raw = _b64_block(strs) if strs else np.empty((0, HOLDER_SLICE["length"]), dtype=np.uint8)
+    if odd:
+        extra = [d[:40] for d in map(base64.b64decode, odd) if len(d) >= 40]
+        if extra:
+            raw = np.concatenate([raw, np.frombuffer(b"".join(extra), dtype=np.uint8).reshape(-1, 40)])
+    return raw.view(SLICE_DTYPE).reshape(-1)
+
+
+def aggregate_holder_slices(slices: "np.ndarray") -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    按 owner 汇总（一个 owner 可能有多个 token 账户），去掉 0 余额和 incinerator。
+    返回 (owners V32, amounts uint64)，按余额降序。
+    """
+    keep = (slices["amount"] > 0) & (slices["owner"] != np.void(_INCINERATOR_RAW))
+    s = slices[keep]
+    if not len(s):
+        return s["owner"], s["amount"]
+    s = s[np.argsort(s["owner"], kind="stable")]
+    owner = s["owner"]
+    starts = np.flatnonzero(np.append(True, owner[1:] != owner[:-1]))
+    owners, amounts = owner[starts], np.add.reduceat(s["amount"], starts)
+    order = np.argsort(amounts, kind="stable")[::-1]
+    return owners[order], amounts[order]
+
+
 async def get_multiple_accounts(pubkeys: list[str]) -> dict:
     params = [pubkeys, {"encoding": "base64"}]
     return await rpc_call("getMultipleAccounts", params)
@@ -65,7 +147,6 @@ async def filter_user_wallets(candidates: List[str]) -> List[str]:
     """
     keep: List[str] = []
     resp = await get_multiple_accounts(candidates)
-    print(resp)
     values = resp.get("value") or []
 
     for i, acc in enumerate(values):
@@ -0,0 +1,78 @@
+# pumpbot/chain/transactions.py
+import asyncio
+from typing import AsyncIterator, Callable, Dict, List, Optional
+from pumpbot.config import CONFIG
+from pumpbot.chain.rpc import rpc_call
+
+
+async def iter_signature_pages(address: str, since_ms: Optional[int] = None, limit: int = 1000) -> AsyncIterator[List[dict]]:
+    """
+    getSignaturesForAddress 按“新→旧”翻页；碰到 blockTime < since_ms 就截断并停止，
+    不再多翻一页。
+    """
+    before = None
+    while True:
+        opts = {"limit": limit, "commitment": "confirmed"}
+        if before:
+            opts["before"] = before
+        page = await rpc_call("getSignaturesForAddress", [address, opts]) or []
+        if not page:
+            return
+        keep = page
+        if since_ms is not None:
+            keep = [s for s in page if not (s.get("blockTime") and s["blockTime"] * 1000 < since_ms)]
+        if keep:
+            yield keep
+        if len(keep) < len(page) or len(page) < limit:
+            return
+        before = page[-1]["signature"]
+
+
+async def hydrate_transactions(
+    address: str,
+    on_tx: Callable[[dict, Optional[dict]], None],
+    *,
+    since_ms: Optional[int] = None,
+    concurrency: int = CONFIG["TX_HYDRATE_CONCURRENCY"],
+    encoding: str = "base64",
+) -> Dict[str, int]:
+    """
+    边翻签名页边拉交易：一个 producer 翻页，concurrency 个 worker 并发 getTransaction。
+    并发的 rpc_call 会被 batcher 合并成 JSON-RPC batch，总速率由 rpc 令牌桶决定。
+    encoding 默认 base64：只要 meta（fee 等），不让节点解析/展开指令。
+    on_tx(sig_info, tx_result) 对每笔交易调用一次（拉取失败时 tx_result 为 None）。
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 4)
+    counts = {"signatures": 0, "fetched": 0, "failed": 0}
+    opts = {"encoding": encoding, "maxSupportedTransactionVersion": 0, "commitment": "confirmed"}
+
+    async def _producer():
+        try:
+            async for page in iter_signature_pages(address, since_ms):
+                for s in page:
+                    counts["signatures"] += 1
+                    await queue.put(s)
+        finally:
+            for _ in range(concurrency):
+                await queue.put(None)
+
+    async def _worker():
+        while True:
+            s = await queue.get()
+            if s is None:
+                return
+            try:
+                tx = await rpc_call("getTransaction", [s["signature"], opts])
+                counts["fetched"] += 1
+            except Exception:
+                tx = None
+                counts["failed"] += 1
+            on_tx(s, tx)
+
+    tasks = [asyncio.create_task(_producer())] + [asyncio.create_task(_worker()) for _ in range(concurrency)]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for t in tasks:
+            t.cancel()
+    return counts
@@ -0,0 +1,139 @@
+# pumpbot/chain/tx_waiter.py
+# 刚从 logsSubscribe 看到的签名，getTransaction 往往要过一两秒才查得到。
+# 这里用一个时间轮统一等待：每个 tick 把到期的签名一起查一次（rpc_call 会合并成 JSON-RPC batch），
+# 查到就立即返回，查不到按 TX_WAIT_SCHEDULE_SEC 排到后面的槽位，而不是每个签名一个 sleep 的协程。
+import asyncio
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from pumpbot.config import CONFIG
+from pumpbot.chain.rpc import rpc_call
+from pumpbot.util.lifecycle import on_shutdown
+
+
+@dataclass
+class _Entry:
+    signature: str
+    callbacks: List[Callable[[Optional[dict]], None]] = field(default_factory=list)
+    attempt: int = 0
+    rounds: int = 0     # 还要再转几圈才到期
+
+
+class TxWaiter:
+    """
+    tx = await waiter.wait(signature)   # 交易 dict（getTransaction 的 result），超出重试次数返回 None
+    waiter.watch(signature, on_tx)      # 不占协程：查到（或放弃）时回调 on_tx(tx)
+    """
+
+    def __init__(self, tick_sec: float, slots: int, schedule_sec: List[float], encoding: str):
+        self.tick = tick_sec
+        self.slots: List[List[_Entry]] = [[] for _ in range(max(2, slots))]
+        self.cur = 0
+        # 每次重试距上次的间隔，换算成 tick 数（至少 1）
+        self.schedule = [max(1, round(d / tick_sec)) for d in schedule_sec]
+        self.opts = {"encoding": encoding, "commitment": "confirmed", "maxSupportedTransactionVersion": 0}
+        self._waiting: Dict[str, _Entry] = {}
+        self._driver: Optional[asyncio.Task] = None
+        self._fetches: set[asyncio.Task] = set()
+        self.counters: Dict[str, int] = {"submitted": 0, "resolved": 0, "expired": 0, "ticks": 0, "lookups": 0, "fetch_ticks": 0}
+
+    def _place(self, e: _Entry, ticks: int):
+        n = len(self.slots)
+        e.rounds = (ticks - 1) // n
+        self.slots[(self.cur + ticks) % n].append(e)
+
+    def watch(self, signature: str, callback: Callable[[Optional[dict]], None]):
+        e = self._waiting.get(signature)
+        if e is None:
+            e = self._waiting[signature] = _Entry(signature)
+            self.counters["submitted"] += 1
+            self._place(e, self.schedule[0])
+        e.callbacks.append(callback)
+        if self._driver is None or self._driver.done():
+            self._driver = asyncio.create_task(self._run())
+
+    async def wait(self, signature: str) -> Optional[dict]:
+        fut = asyncio.get_running_loop().create_future()
+        self.watch(signature, lambda tx: fut.done() or fut.set_result(tx))
+        return await fut
+
+    async def _run(self):
+        # 只在有等待中的签名时转动，空闲时退出
+        loop = asyncio.get_running_loop()
+        next_at = loop.time()
+        while self._waiting:
+            next_at += self.tick
+            await asyncio.sleep(max(0.0, next_at - loop.time()))
+            self.cur = (self.cur + 1) % len(self.slots)
+            self.counters["ticks"] += 1
+            bucket, due = self.slots[self.cur], []
+            self.slots[self.cur] = []
+            for e in bucket:
+                if e.rounds:
+                    e.rounds -= 1
+                    self.slots[self.cur].append(e)
+                else:
+                    due.append(e)
+            if due:
+                # 慢请求不拖慢时间轮
+                t = asyncio.create_task(self._fetch(due))
+                self._fetches.add(t)
+                t.add_done_callback(self._fetches.discard)
+
+    def _resolve(self, e: _Entry, tx: Optional[dict]):
+        self._waiting.pop(e.signature, None)
+        self.counters["resolved" if tx else "expired"] += 1
+        for cb in e.callbacks:
+            try:
+                cb(tx)
+            except Exception as ex:
+                print(f"[tx_waiter] callback for {e.signature} failed: {ex}")
+
+    async def _fetch(self, due: List[_Entry]):
+        self.counters["lookups"] += len(due)
+        self.counters["fetch_ticks"] += 1
+        results = await asyncio.gather(
+            *(rpc_call("getTransaction", [e.signature, self.opts]) for e in due),
+            return_exceptions=True,
+        )
+        for e, tx in zip(due, results):
+            if isinstance(tx, dict) and tx:
+                self._resolve(e, tx)
+                continue
+            e.attempt += 1
+            if e.attempt >= len(self.schedule):
+                self._resolve(e, None)
+            else:
+                self._place(e, self.schedule[e.attempt])
+        if self._waiting and (self._driver is None or self._driver.done()):
+            self._driver = asyncio.create_task(self._run())
+
+    async def close(self):
+        tasks = [t for t in [self._driver, *self._fetches] if t is not None]
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for e in list(self._waiting.values()):
+            self._resolve(e, None)
+        self.slots = [[] for _ in self.slots]
+
+    def stats(self) -> Dict[str, int]:
+        return {**self.counters, "waiting": len(self._waiting)}
+
+
+waiter = TxWaiter(
+    CONFIG["TX_WAIT_TICK_SEC"], CONFIG["TX_WAIT_SLOTS"], CONFIG["TX_WAIT_SCHEDULE_SEC"], CONFIG["TX_WAIT_ENCODING"],
+)
+
+
+async def wait_for_transaction(signature: str) -> Optional[dict]:
+    return await waiter.wait(signature)
+
+
+def on_transaction(signature: str, callback: Callable[[Optional[dict]], None]):
+    waiter.watch(signature, callback)
+
+
+@on_shutdown
+async def close_waiter():
+    await waiter.close()
@@ -6,6 +6,8 @@ load_dotenv()
 
 
 RPC_URL = os.getenv("RPC_URL")
+# extra endpoints for the RPC router, comma separated; RPC_URL is always included first
+RPC_URLS = [RPC_URL] + [u.strip() for u in os.getenv("RPC_URLS", "").split(",") if u.strip() and u.strip() != RPC_URL]
 HELIUS_API_KEY = os.getenv("HELIUS_API_KEY")
 SERVERCHAN_KEY = os.getenv("SERVERCHAN_KEY", "")
 BIRDEYE_API_KEY = os.getenv("BIRDEYE_API_KEY", "")
@@ -25,10 +27,151 @@ CONFIG = {
 
 "HTTP_TIMEOUT": 15,
 "PRICE_TIMEOUT": 10,
+"PRICE_BATCH_MAX": 100,          # addresses per Birdeye /defi/multi_price request
+"PRICE_BATCH_WINDOW_MS": 50,     # price lookups within one tick share a request
+"HOLDERS_SOURCE": "onchain",     # top-N holder ratio: "onchain" (getProgramAccounts) or "birdeye"
+
+
+# shared HTTP clients (pumpbot.util.http)
+"HTTP2": True,
+"HTTP_MAX_CONNECTIONS": 20,
+"HTTP_MAX_KEEPALIVE": 10,
+"HTTP_KEEPALIVE_EXPIRY": 60,
+"HTTP_HOST_LIMITS": {
+    # per-host max_connections override
+    "streaming.bitquery.io": 4,
+    "sctapi.ftqq.com": 2,
+},
+
+
+# pooled solana AsyncClients per (endpoint, commitment)
+"RPC_CLIENT_POOL_SIZE": 2,
+
+
+# JSON-RPC batching (pumpbot.chain.rpc); RPC_BATCH_MAX <= 1 disables it; capped at RATE_LIMITS["rpc"]["burst"]
+"RPC_BATCH_MAX": 40,
+"RPC_BATCH_WINDOW_MS": 5,
+
+
+# multi-endpoint RPC router (see RPC_URLS)
+"RPC_STATS_WINDOW": 50,          # rolling samples per (endpoint, method)
+"RPC_ERROR_PENALTY": 4.0,        # score = p50 * (1 + penalty * error_rate)
+"RPC_HEDGE_PERCENTILE": 0.9,
+"RPC_HEDGE_DEFAULT_MS": 800,     # hedge delay until an endpoint has enough samples
+"RPC_HEDGE_MIN_MS": 50,
+"RPC_HEDGE_METHODS": [
+    "getTransaction",
+    "getSignaturesForAddress",
+    "getMultipleAccounts",
+    "getTokenSupply",
+    "getAccountInfo",
+],
+
+
+# per-provider token buckets (pumpbot.util.ratelimit); set to the quota you pay for
+"RATE_LIMITS": {
+    "rpc": {"rate": 40, "burst": 40},
+    "birdeye": {"rate": 15, "burst": 15},
+    "dexscreener": {"rate": 5, "burst": 10},      # token-pairs: 300 req/min
+    "bitquery": {"rate": 1, "burst": 3},
+    "serverchan": {"rate": 0.5, "burst": 2},
+},
+# host -> provider; RPC_URLS hosts map to "rpc" automatically
+"RATE_LIMIT_HOSTS": {
+    "api.dexscreener.com": "dexscreener",
+    "public-api.birdeye.so": "birdeye",
+    "streaming.bitquery.io": "bitquery",
+    "sctapi.ftqq.com": "serverchan",
+},
+
+
+# in-process response caches (pumpbot.util.cache); ttl None = never expires (LRU only)
+# negative_ttl applies to "not found" (None) results
+"CACHE": {
+    "dex_pair": {"ttl": None, "negative_ttl": 3, "max_entries": 20000},
+    "dex_pair_detail": {"ttl": 3, "negative_ttl": 3, "max_entries": 5000},
+    "birdeye_price": {"ttl": 3, "negative_ttl": 3, "max_entries": 5000},
+    "supply": {"ttl": 300, "negative_ttl": 0, "max_entries": 20000},
+    "mint_birth": {"ttl": 24 * 3600, "negative_ttl": 60, "max_entries": 50000},
+    "mint_program": {"ttl": None, "negative_ttl": 0, "max_entries": 20000},
+},
+
+
+# on-disk store for immutable token facts (pumpbot.util.store)
+"STORE_ENABLED": True,
+"STORE_PATH": "data/facts.sqlite",
+"STORE_FLUSH_SEC": 1.0,
+
+
+# concurrent getTransaction workers when walking an address history (pumpbot.chain.transactions)
+"TX_HYDRATE_CONCURRENCY": 16,
+
+
+# waiting for freshly-seen signatures to become fetchable (pumpbot.chain.tx_waiter)
+"TX_WAIT_TICK_SEC": 0.5,
+"TX_WAIT_SLOTS": 64,
+"TX_WAIT_SCHEDULE_SEC": [0.5, 0.5, 1, 1, 2, 2, 4, 8],   # delay before each getTransaction attempt
+"TX_WAIT_ENCODING": "base64",    # only meta is read; skip parsing the message
+
+
+# event-ingestion bus (pumpbot.ingest)
+"BUS_SOURCE_QUEUE": 1000,        # per-source queue; full -> backpressure on the socket reader
+"BUS_SUBSCRIBER_QUEUE": 1000,
+"BUS_SUBSCRIBER_DROP": "oldest", # subscriber queue full -> drop "oldest" queued event or the "newest" one
+"BUS_DEDUPE_SIZE": 50000,
+# websocket streams (pumpbot.ingest.stream)
+"STREAM_PING_SEC": 20,
+"STREAM_IDLE_SEC": 30,           # no frame for this long -> heartbeat ping
+"STREAM_PONG_TIMEOUT_SEC": 10,   # no pong -> stalled, reconnect
+"STREAM_BACKOFF_BASE_SEC": 0.5,
+"STREAM_BACKOFF_MAX_SEC": 30,
+
+
+# mint birth-time index fed from creation streams (pumpbot.watchers.births)
+"BIRTH_INDEX_ENABLED": True,
+"DBC_PROGRAM_ID": "dbcij3LWUppWqq96dh6gJWwBifmcGfLSB5D4DuSMaqN",  # Meteora DBC
+
+
+# live post-migration trade tracking (pumpbot.watchers.trades)
+"TRADE_TRACKER_ENABLED": True,
+"TRACKER_MAX_MINTS": 200,        # least-recently tracked mints are unsubscribed beyond this
+"TRACKER_TTL_SEC": 6 * 3600,
+"TRACKER_RESOLVE_TX": True,      # look up slot / fee for trades whose frame lacks them
+
+
+# paginated Bitquery EAP reads (pumpbot.bitquery.eap)
+"BITQUERY_PAGE_SIZE": 10_000,    # rows per request, paged by slot cursor
+"BITQUERY_PAGE_RETRIES": 3,      # a failed page is retried on its own
+"BITQUERY_PAGE_TIMEOUT": 30,
+"BITQUERY_MAX_ROWS": 1_000_000,  # per query; stops paging beyond this
+
+
+# per-mint analysis scheduler (pumpbot.util.scheduler)
+"SCHED_WORKERS": 8,
+"SCHED_QUEUE": 256,              # pending jobs beyond this are rejected
+"SCHED_DRAIN_SEC": 30,           # graceful drain budget on shutdown
+"ANALYSIS_DEADLINE_SEC": 10 * 60,  # migrations older than this are shed instead of analyzed
+
+
+# migration screen filters (pumpbot.detectors.migration)
+"MIN_MCAP_USD": 100_000,
+"MAX_MCAP_USD": 250_000,
+"MAX_GLOBAL_GAS_SOL": 10.0,
+"MIN_BUNDLE_RATIO": 0.20,
+"ONE_SHOT_BUY_WINDOW_SEC": 5,    # first seconds after pool creation checked for a one-shot buy
+"ONE_SHOT_MIN_SOL": 1.0,
+"ONE_SHOT_MIN_HOLDING": 0.10,
+"SKIP_ONE_SHOT": True,
+"NOTIFY_ONLY_PASS": True,        # also lets the screen stop at the first failed filter
+"SCREEN_PAIR_RETRIES": 3,        # pair lookups retried this many times (PAIR_RETRY_SLEEP apart) before has_pair fails
+"SCREEN_PREFETCH": 1,            # stages for this many upcoming filters start alongside the current one
+"SCREEN_REPLAN_EVERY": 20,       # filter order is re-derived from observed cost/rejection every N mints
 
 
 "PAIR_MAX_RETRIES": 8,
-"PAIR_RETRY_SLEEP": 5,
+"PAIR_RETRY_SLEEP": 5,           # one shared polling round for all mints still waiting for a pair
+"PAIR_BATCH_MAX": 30,            # addresses per Dexscreener /tokens/v1 request
+"PAIR_BATCH_WINDOW_MS": 50,      # newly requested mints wait this long to share a request
 
 
 # default windows
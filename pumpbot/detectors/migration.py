@@ -0,0 +1,171 @@
+# pumpbot/detectors/migration.py
+# 迁移 mint 的筛选：pair → mcap / gas / one-shot / bundle 组成依赖图，
+# 每个过滤条件在输入到齐时立即判定，不通过就取消还在跑的（比如几分钟的 gas 扫描）。
+# 只推 PASS 时按 screen.plan() 的顺序（便宜且常拒绝的先判）逐步花钱；cost 是首次运行前的耗时预估（ms）。
+import time
+import asyncio
+from typing import Optional
+
+from pumpbot.config import CONFIG
+from pumpbot.chain.rpc import acquire_client, rpc_call
+from pumpbot.dex.dexscreener import retry_get_pair
+from pumpbot.metrics.bundler import get_bundle_ratio_bitquery
+from pumpbot.metrics.gas import calc_global_gas_fee_sol
+from pumpbot.metrics.mcap import fast_mcap_usd, get_total_supply_ui
+from pumpbot.util.dag import FeatureGraph, Outcome
+from pumpbot.util.notify import notify_serverchan
+
+
+async def check_one_shot_buy(pair_addr: str, created_ms: int, mint: str) -> bool:
+    """建池后 ONE_SHOT_BUY_WINDOW_SEC 内，是否有一笔 Jito 大额买入直接拿走 ≥ ONE_SHOT_MIN_HOLDING 的供应。"""
+    try:
+        async with acquire_client() as client:
+            supply, _ = await get_total_supply_ui(client, mint)
+        sigs = await rpc_call("getSignaturesForAddress", [pair_addr, {"limit": 50}]) or []
+        window_end = created_ms + CONFIG["ONE_SHOT_BUY_WINDOW_SEC"] * 1000
+        cands = [s["signature"] for s in sigs if not (s.get("blockTime") and s["blockTime"] * 1000 > window_end)]
+        opts = {"encoding": "json", "commitment": "confirmed", "maxSupportedTransactionVersion": 0}
+        txs = await asyncio.gather(*(rpc_call("getTransaction", [sig, opts]) for sig in cands),
+                                   return_exceptions=True)
+        for tx in txs:
+            meta = (tx or {}).get("meta") if isinstance(tx, dict) else None
+            if not meta:
+                continue
+            # Jito bundle: 日志里有 "Jito"，且 fee > 0.01 SOL
+            is_jito = any("Jito" in line for line in meta.get("logMessages") or [])
+            fee = int(meta.get("fee") or 0)
+            if not is_jito or fee / 1e9 < 0.01:
+                continue
+            pre, post = meta.get("preBalances") or [], meta.get("postBalances") or []
+            if not pre or not post:
+                continue
+            sol_spent = (pre[0] - post[0] - fee) / 1e9  # signer 是第一个账户
+            if sol_spent < CONFIG["ONE_SHOT_MIN_SOL"]:
+                continue
+            for bal in meta.get("postTokenBalances") or []:
+                ui = float((bal.get("uiTokenAmount") or {}).get("uiAmount") or 0)
+                if bal.get("mint") == mint and ui > 0 and supply and ui / supply >= CONFIG["ONE_SHOT_MIN_HOLDING"]:
+                    print(f"One-shot detected: {bal.get('owner')} holds {ui / supply * 100:.2f}% with {sol_spent:.2f} SOL spent")
+                    return True
+        return False
+    except Exception as e:
+        print(f"One-shot check error: {e}")
+        return False
+
+
+screen = FeatureGraph("migration", prefetch=CONFIG["SCREEN_PREFETCH"], replan_every=CONFIG["SCREEN_REPLAN_EVERY"])
+
+
+def _created_ms(pair: dict) -> int:
+    return int(pair.get("pairCreatedAt") or int(time.time() * 1000))
+
+
+@screen.stage("pair", "mint", cost=500)
+async def _pair(mint: str) -> Optional[dict]:
+    # 和原来一样最多再查 SCREEN_PAIR_RETRIES 次（5s 一次）：拿不到池子就尽快判 has_pair 失败，不拖住后面的过滤
+    return await retry_get_pair(mint, retries=CONFIG["SCREEN_PAIR_RETRIES"])
+
+
+@screen.stage("mcap", "mint", cost=800)
+async def _mcap(mint: str):
+    async with acquire_client() as client:
+        return await fast_mcap_usd(client, mint)
+
+
+@screen.stage("gas", "pair", cost=60_000)
+async def _gas(pair: Optional[dict]) -> Optional[float]:
+    if not pair:
+        return None
+    return await calc_global_gas_fee_sol(None, str(pair.get("pairAddress")), _created_ms(pair))
+
+
+@screen.stage("one_shot", "mint", "pair", cost=3_000)
+async def _one_shot(mint: str, pair: Optional[dict]) -> bool:
+    if not pair:
+        return False
+    return await check_one_shot_buy(str(pair.get("pairAddress")), _created_ms(pair), mint)
+
+
+@screen.stage("bundle", "pair", cost=3_000)
+async def _bundle(pair: Optional[dict]) -> Optional[float]:
+    # 建池后 BUNDLE_WINDOW_SEC 内，pair 的交易里 bundle 交易的占比（MIN_BUNDLE_RATIO 按这个指标定的）
+    if not pair:
+        return None
+    t1 = int(_created_ms(pair) / 1000)
+    return await get_bundle_ratio_bitquery(str(pair.get("pairAddress")), t1, t1 + CONFIG["BUNDLE_WINDOW_SEC"])
+
+
+@screen.check("has_pair", "pair", hard=True)
+def _has_pair(pair) -> bool:
+    return pair is not None
+
+
+@screen.check("has_price", "mcap", hard=True)
+def _has_price(mcap) -> bool:
+    return bool(mcap and mcap[0] and mcap[1])
+
+
+@screen.check("not_one_shot", "one_shot", hard=True)
+def _not_one_shot(one_shot) -> bool:
+    return not (CONFIG["SKIP_ONE_SHOT"] and one_shot)
+
+
+@screen.check("mcap_range", "mcap")
+def _mcap_range(mcap) -> bool:
+    return bool(mcap and mcap[0]) and CONFIG["MIN_MCAP_USD"] <= mcap[0] <= CONFIG["MAX_MCAP_USD"]
+
+
+@screen.check("max_gas", "gas")
+def _gas_ok(gas) -> bool:
+    return gas is not None and gas < CONFIG["MAX_GLOBAL_GAS_SOL"]
+
+
+@screen.check("min_bundle", "bundle")
+def _bundle_ok(bundle) -> bool:
+    # 没有 Bitquery（拿不到比例）时不作为过滤条件
+    return bundle is None or bundle >= CONFIG["MIN_BUNDLE_RATIO"]
+
+
+screen.validate(inputs=("mint",))
+
+
+async def screen_migration(mint: str) -> Outcome:
+    # 只推 PASS 时，任一过滤不通过就可以停；否则要把所有特征算完用于 CANDIDATE 推送
+    return await screen.run(short_circuit=CONFIG["NOTIFY_ONLY_PASS"], mint=mint)
+
+
+async def handle_migration(mint: str, push: bool = True) -> Outcome:
+    print("[MIGRATION]", mint)
+    out = await screen_migration(mint)
+    v = out.values
+    hard = {"has_pair": "no pool yet", "has_price": "no price/mcap", "not_one_shot": "One-shot detected"}
+    if out.rejected_by in hard:
+        print(f"  - {hard[out.rejected_by]}, skip {mint}")
+        return out
+
+    status = "PASS" if out.passed else "CANDIDATE"
+    if CONFIG["NOTIFY_ONLY_PASS"] and status != "PASS":
+        print(f"  - Candidate ({out.rejected_by}), skip notify; cancelled={out.cancelled}")
+        return out
+    if not push:
+        return out
+
+    pair_addr = str(v["pair"].get("pairAddress"))
+    mcap, price_usd = v["mcap"]
+    gas_paid = v.get("gas") or 0.0
+    bundle_ratio = v.get("bundle")
+    ds_url = f"https://dexscreener.com/solana/{pair_addr}"
+    title = f"[{status}] Migrated token: {mint[:6]}...{mint[-4:]}"
+    md = (
+        f"**Mint:** `{mint}`\n\n"
+        f"**Pair:** `{pair_addr}`\n\n"
+        f"**Price:** ${price_usd:,.6f}\n\n"
+        f"**MCap (est):** ${mcap:,.0f}  (range: {CONFIG['MIN_MCAP_USD']:,}–{CONFIG['MAX_MCAP_USD']:,})\n\n"
+        f"**Global Gas Fee Paid:** {gas_paid:.3f} SOL  (max < {CONFIG['MAX_GLOBAL_GAS_SOL']})\n\n"
+        f"**Bundle Ratio:** {('N/A' if bundle_ratio is None else f'{bundle_ratio*100:.1f}%')}  (min ≥ {CONFIG['MIN_BUNDLE_RATIO']*100:.0f}% if enabled)\n\n"
+        f"**One-Shot Detected:** {'Yes' if v.get('one_shot') else 'No'}\n\n"
+        f"**DexScreener:** {ds_url}\n\n"
+        f"— sent at {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime())}"
+    )
+    await notify_serverchan(title, md)
+    return out
@@ -4,19 +4,62 @@ from pumpbot.dex.dexscreener import retry_get_pair
 from pumpbot.metrics.holders import compute_top10_holder_ratio
 from pumpbot.metrics.bundlers import get_bundle_stats_bitquery
 from pumpbot.config import CONFIG
+from pumpbot.util.dag import FeatureGraph
 
-async def check_one_shot(client, mint: str, window_sec: int = CONFIG["ONESHOT_WINDOW_SEC"]) -> Tuple[bool, Optional[float], Optional[float], bool, Optional[str], Optional[int]]:
-    pair = await retry_get_pair(mint)
+# one-shot = top10 ≥ 0.70 且 bundle ratio ≥ 0.70 且有 Jito；三个条件的判定顺序由 rule.plan() 按历史拒绝率/耗时决定
+rule = FeatureGraph("oneshot", replan_every=CONFIG["SCREEN_REPLAN_EVERY"])
+
+
+@rule.stage("pair", "mint", cost=500)
+async def _pair(mint: str):
+    return await retry_get_pair(mint)
+
+
+@rule.stage("top10", "client", "mint", cost=1_500)
+async def _top10(client, mint: str):
+    return await compute_top10_holder_ratio(client, mint)
+
+
+@rule.stage("bundle_stats", "pair", "window_sec", cost=5_000)
+async def _bundle_stats(pair, window_sec: int):
     if not pair:
-        return False, None, None, False, None, None
-    pair_addr = str(pair.get("pairAddress"))
-    created_ms = int(pair.get("pairCreatedAt") or int(time.time()*1000))
+        return None, False
+    t1 = int(_created_ms(pair) / 1000)
+    return await get_bundle_stats_bitquery(str(pair.get("pairAddress")), t1, t1 + int(window_sec))
+
+
+@rule.check("has_pair", "pair", hard=True)
+def _has_pair(pair) -> bool:
+    return pair is not None
+
 
-    top10 = await compute_top10_holder_ratio(client, mint)
+@rule.check("top10", "top10")
+def _top10_ok(top10) -> bool:
+    return top10 is not None and top10 >= 0.70
 
-    t1 = int(created_ms/1000)
-    t2 = t1 + int(window_sec)
-    ratio, has_jito = await get_bundle_stats_bitquery(pair_addr, t1, t2)
 
-    is_oneshot = (top10 is not None and ratio is not None and top10 >= 0.70 and ratio >= 0.70 and has_jito)
-    return is_oneshot, top10, ratio, has_jito, pair_addr, created_ms
+@rule.check("bundle_ratio", "bundle_stats")
+def _ratio_ok(stats) -> bool:
+    return stats[0] is not None and stats[0] >= 0.70
+
+
+@rule.check("has_jito", "bundle_stats")
+def _jito_ok(stats) -> bool:
+    return bool(stats[1])
+
+
+rule.validate(inputs=("client", "mint", "window_sec"))
+
+
+def _created_ms(pair: dict) -> int:
+    return int(pair.get("pairCreatedAt") or int(time.time()*1000))
+
+
+async def check_one_shot(client, mint: str, window_sec: int = CONFIG["ONESHOT_WINDOW_SEC"]) -> Tuple[bool, Optional[float], Optional[float], bool, Optional[str], Optional[int]]:
+    """第一个不满足的条件出来就返回，没算到的值为 None / False。"""
+    out = await rule.run(client=client, mint=mint, window_sec=window_sec)
+    pair = out.values.get("pair")
+    if not pair:
+        return False, None, None, False, None, None
+    ratio, has_jito = out.values.get("bundle_stats") or (None, False)
+    return out.passed, out.values.get("top10"), ratio, has_jito, str(pair.get("pairAddress")), _created_ms(pair)
@@ -1,45 +1,185 @@
-from typing import Optional
+import asyncio
+from dataclasses import dataclass
+from typing import Dict, List, Optional
 from pumpbot.util.http import http_get
+from pumpbot.util import jsonfast
 from pumpbot.config import CONFIG
+from pumpbot.util.singleflight import singleflight
+from pumpbot.util.cache import cached, get_cache
+from pumpbot.util.lifecycle import on_shutdown
+from pumpbot.util.store import store
 
 
-async def get_token_pair_from_dexscreener(mint: str) -> Optional[dict]:
-    url = f"{CONFIG['DEX_API']}/token-pairs/v1/solana/{mint}"
-    r = await http_get(url)
-    if r.status_code != 200:
-        return None
-    arr = r.json()
-    if not isinstance(arr, list):
-        return None
-    def _dexid(p: dict) -> str:
-        return str(p.get("dexId", "")).lower()
-    
+def _dexid(p: dict) -> str:
+    return str(p.get("dexId", "")).lower()
+
+
+def _pick_pair(arr: List[dict]) -> Optional[dict]:
+    """pumpswap 优先，没有再看 raydium；同一类里取最新建的池子。"""
     pumps = [p for p in arr if _dexid(p) in ("pumpswap", "pump", "pumpswapamm")]
     if not pumps:
         pumps = [p for p in arr if _dexid(p) == "raydium"]
-    
+
     if not pumps:
         return None
-    
+
     pumps.sort(key=lambda x: x.get("pairCreatedAt", 0), reverse=True)
     return pumps[0]
 
 
-async def retry_get_pair(mint: str) -> Optional[dict]:
-    from asyncio import sleep
+@dataclass
+class _Waiter:
+    fut: asyncio.Future
+    left: int           # 还能再落空几轮
+    due: float          # 这个时间之后的轮次才计入 left（被别的 mint 提前带着查的不算）
+
+
+class PairResolver:
+    """
+    所有在等 pair 的 mint 放在一起，按同一个节奏用多 token 接口（/tokens/v1/solana/a,b,c，≤ PAIR_BATCH_MAX 个）批量查，
+    而不是每个 mint 各自每 PAIR_RETRY_SLEEP 秒轮询一次。
+      pair = await pairs.resolve(mint, retries=8)   # 查到即返回；再查 retries 轮都没有返回 None
+    新加入的 mint 等 PAIR_BATCH_WINDOW_MS 凑一批（soon=False 则排到下一轮）；
+    之后每 PAIR_RETRY_SLEEP 秒一轮，每轮把所有等待中的 mint 一起查。
+    """
+
+    def __init__(self, batch_max: int, window_sec: float, interval_sec: float):
+        self.batch_max = batch_max
+        self.window = window_sec
+        self.interval = interval_sec
+        self._waiting: Dict[str, List[_Waiter]] = {}
+        self._fresh = asyncio.Event()
+        self._next_round = 0.0
+        self._driver: Optional[asyncio.Task] = None
+        self.counters: Dict[str, int] = {"requests": 0, "lookups": 0, "resolved": 0, "gave_up": 0}
+
+    async def resolve(self, mint: str, retries: int = 0, soon: bool = True) -> Optional[dict]:
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        idle = self._driver is None or self._driver.done()
+        if soon:
+            self._fresh.set()
+        elif idle:
+            self._next_round = loop.time() + self.interval
+        due = loop.time() + (0 if soon else self.interval * 0.5)
+        self._waiting.setdefault(mint, []).append(_Waiter(fut, retries, due))
+        if idle:
+            self._driver = asyncio.create_task(self._run())
+        return await fut
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while self._waiting:
+            # 有新 mint：等一个短窗口凑批；否则等到下一轮
+            timeout = max(0.0, self._next_round - loop.time())
+            try:
+                await asyncio.wait_for(self._fresh.wait(), timeout=timeout)
+                await asyncio.sleep(self.window)
+            except asyncio.TimeoutError:
+                pass
+            self._fresh.clear()
+            self._next_round = loop.time() + self.interval
+            await self._round(list(self._waiting))
+
+    async def _round(self, mints: List[str]):
+        chunks = [mints[i:i + self.batch_max] for i in range(0, len(mints), self.batch_max)]
+        self.counters["requests"] += len(chunks)
+        self.counters["lookups"] += len(mints)
+        found: Dict[str, List[dict]] = {}
+        for res in await asyncio.gather(*(self._fetch(c) for c in chunks), return_exceptions=True):
+            if isinstance(res, Exception):
+                print(f"[dexscreener] batch lookup failed: {res}")
+                continue
+            for p in res:
+                for side in ("baseToken", "quoteToken"):
+                    addr = (p.get(side) or {}).get("address")
+                    if addr:
+                        found.setdefault(addr, []).append(p)
+
+        for mint in mints:
+            pair = _pick_pair(found.get(mint) or [])
+            waiters = self._waiting.get(mint) or []
+            if pair is not None:
+                self._remember(mint, pair)
+                self.counters["resolved"] += 1
+                del self._waiting[mint]
+                done = waiters
+            else:
+                now = asyncio.get_running_loop().time()
+                counted = [w for w in waiters if w.due <= now]
+                done = [w for w in counted if w.left <= 0]
+                for w in counted:
+                    w.left -= 1
+                    w.due = now + self.interval * 0.5
+                rest = [w for w in waiters if w.left >= 0]
+                if rest:
+                    self._waiting[mint] = rest
+                else:
+                    self._waiting.pop(mint, None)
+                self.counters["gave_up"] += bool(done)
+            for w in done:
+                if not w.fut.done():
+                    w.fut.set_result(pair)
+
+    async def _fetch(self, mints: List[str]) -> List[dict]:
+        r = await http_get(f"{CONFIG['DEX_API']}/tokens/v1/solana/{','.join(mints)}")
+        if r.status_code != 200:
+            raise RuntimeError(f"HTTP {r.status_code}")
+        arr = jsonfast.loads(r.content)
+        return arr if isinstance(arr, list) else []
+
+    @staticmethod
+    def _remember(mint: str, pair: dict):
+        # 与 get_token_pair_from_dexscreener 共用缓存：retry 查到的下次直接命中
+        get_cache("dex_pair").set(mint, pair)
+        if CONFIG["STORE_ENABLED"]:
+            store.put("dex_pair", mint, pair)
+
+    async def close(self):
+        if self._driver is not None:
+            self._driver.cancel()
+            await asyncio.gather(self._driver, return_exceptions=True)
+            self._driver = None
+        for waiters in self._waiting.values():
+            for w in waiters:
+                if not w.fut.done():
+                    w.fut.set_result(None)
+        self._waiting.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {**self.counters, "waiting": len(self._waiting)}
+
+
+pairs = PairResolver(CONFIG["PAIR_BATCH_MAX"], CONFIG["PAIR_BATCH_WINDOW_MS"] / 1000, CONFIG["PAIR_RETRY_SLEEP"])
+
+
+@on_shutdown
+async def close_pair_resolver():
+    await pairs.close()
+
+
+# pair 地址/创建时间不会变，永久缓存并落盘；“还没有池子”只负缓存几秒，retry_get_pair 照常重查
+@cached("dex_pair", key=lambda mint: mint, persist=True)
+@singleflight("dexscreener")
+async def get_token_pair_from_dexscreener(mint: str) -> Optional[dict]:
+    return await pairs.resolve(mint)
+
+
+async def retry_get_pair(mint: str, retries: Optional[int] = None) -> Optional[dict]:
     pair = await get_token_pair_from_dexscreener(mint)
-    retries = 0
-    while not pair and retries < CONFIG["PAIR_MAX_RETRIES"]:
-        await sleep(CONFIG["PAIR_RETRY_SLEEP"])
-        pair = await get_token_pair_from_dexscreener(mint)
-        retries += 1
-    return pair
+    retries = CONFIG["PAIR_MAX_RETRIES"] if retries is None else retries
+    if pair or retries <= 0:
+        return pair
+    # 还没有池子：加入共享的批量轮询，最多再查 retries 轮（默认 PAIR_MAX_RETRIES）
+    return await pairs.resolve(mint, retries=retries - 1, soon=False)
 
 
+@cached("dex_pair_detail")
+@singleflight("dexscreener")
 async def get_pair_detail(pair_addr: str) -> Optional[dict]:
     url = f"{CONFIG['DEX_API']}/latest/dex/pairs/solana/{pair_addr}"
     r = await http_get(url)
     if r.status_code != 200:
         return None
-    data = r.json()
+    data = jsonfast.loads(r.content)
     return (data.get("pairs") or [None])[0]
\ No newline at end of file
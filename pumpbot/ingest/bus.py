@@ -0,0 +1,169 @@
+# pumpbot/ingest/bus.py
+import asyncio
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, Type
+
+from pumpbot.config import CONFIG
+from pumpbot.ingest.events import Event
+from pumpbot.util.lifecycle import on_shutdown
+
+Emit = Callable[[Event], Awaitable[None]]
+
+
+class Source:
+    """
+    一个上游连接（PumpPortal WS、Solana logs WS…）。
+    run(emit) 负责连接/重连/解析，把解析好的 Event 交给 emit；emit 在队列满时会阻塞（背压）。
+    """
+
+    name = "source"
+
+    def __init__(self):
+        self.counters: Dict[str, int] = {
+            "received": 0, "parsed": 0, "ignored": 0, "dropped": 0,
+            "duplicate": 0, "delivered": 0, "sub_errors": 0, "reconnects": 0, "stalls": 0,
+        }
+
+    async def run(self, emit: Emit):
+        raise NotImplementedError
+
+
+class Subscription:
+    """
+    async for ev in sub: ...  —— 只收到 types 中且 where(ev) 为真的事件。
+    队列满时不等消费者：drop="oldest" 挤掉最早排队的，"newest" 丢掉新来的；都计入 dropped。
+    """
+
+    def __init__(self, bus: "EventBus", types: Tuple[Type[Event], ...], where, maxsize: int, drop: str):
+        if drop not in ("oldest", "newest"):
+            raise ValueError(f"drop must be 'oldest' or 'newest', got {drop!r}")
+        self._bus = bus
+        self.types = types
+        self.where = where
+        self.drop = drop
+        self.dropped = 0
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+
+    def matches(self, ev: Event) -> bool:
+        return isinstance(ev, self.types) and (self.where is None or self.where(ev))
+
+    def offer(self, ev: Event) -> bool:
+        """不阻塞地投递；返回 False 表示 ev 本身被丢了。"""
+        try:
+            self.queue.put_nowait(ev)
+            return True
+        except asyncio.QueueFull:
+            pass
+        self.dropped += 1
+        if self.drop == "newest":
+            return False
+        self.queue.get_nowait()
+        self.queue.task_done()
+        self.queue.put_nowait(ev)
+        return True
+
+    async def get(self) -> Event:
+        return await self.queue.get()
+
+    def close(self):
+        self._bus.unsubscribe(self)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Event:
+        return await self.queue.get()
+
+
+class EventBus:
+    """
+    统一的事件入口：
+      - 注册 source（每种上游只连一次）
+      - 每个 source 一个有界队列，下游慢时反压到 source 的读循环
+      - 按事件 key 去重（有界 LRU），再扇出给所有匹配的订阅者；
+        订阅者队列满了按它自己的 drop 策略丢事件，一个慢订阅者不会卡住分发和别的订阅者
+    """
+
+    def __init__(self, source_queue: int, dedupe_size: int):
+        self.source_queue = source_queue
+        self.dedupe_size = dedupe_size
+        self._sources: Dict[str, Source] = {}
+        self._subs: List[Subscription] = []
+        self._tasks: Dict[str, List[asyncio.Task]] = {}
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+
+    def register(self, source: Source) -> Source:
+        self._sources[source.name] = source
+        return source
+
+    def source(self, name: str) -> Source:
+        return self._sources[name]
+
+    def subscribe(self, *types: Type[Event], where: Optional[Callable[[Event], bool]] = None,
+                  maxsize: int = CONFIG["BUS_SUBSCRIBER_QUEUE"],
+                  drop: str = CONFIG["BUS_SUBSCRIBER_DROP"]) -> Subscription:
+        sub = Subscription(self, types or (Event,), where, maxsize, drop)
+        self._subs.append(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        if sub in self._subs:
+            self._subs.remove(sub)
+
+    def start(self, *names: str):
+        """启动指定 source（已在跑的忽略）；不传则启动全部已注册的。"""
+        for name in names or list(self._sources):
+            if name in self._tasks:
+                continue
+            src = self._sources[name]
+            q: asyncio.Queue = asyncio.Queue(maxsize=self.source_queue)
+            self._tasks[name] = [
+                asyncio.create_task(src.run(q.put)),
+                asyncio.create_task(self._dispatch(src, q)),
+            ]
+
+    def _is_dup(self, key: str) -> bool:
+        if key in self._seen:
+            self._seen.move_to_end(key)
+            return True
+        self._seen[key] = None
+        if len(self._seen) > self.dedupe_size:
+            self._seen.popitem(last=False)
+        return False
+
+    async def _dispatch(self, src: Source, q: asyncio.Queue):
+        c = src.counters
+        while True:
+            ev: Event = await q.get()
+            if self._is_dup(ev.key):
+                c["duplicate"] += 1
+                continue
+            for sub in list(self._subs):
+                try:
+                    if sub.matches(ev) and sub.offer(ev):
+                        c["delivered"] += 1
+                except Exception as e:
+                    # 订阅者自己的 where 出错只跳过它这一条，不能把整个 source 的分发循环带崩
+                    c["sub_errors"] += 1
+                    print(f"[bus] {src.name}: subscriber filter failed on {ev.key}: {e}")
+
+    async def stop(self):
+        tasks = [t for ts in self._tasks.values() for t in ts]
+        self._tasks.clear()
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, dict]:
+        return {
+            "sources": {name: dict(src.counters) for name, src in self._sources.items()},
+            "subscribers": [{"depth": sub.queue.qsize(), "dropped": sub.dropped} for sub in self._subs],
+        }
+
+
+bus = EventBus(CONFIG["BUS_SOURCE_QUEUE"], CONFIG["BUS_DEDUPE_SIZE"])
+
+
+@on_shutdown
+async def stop_bus():
+    await bus.stop()
@@ -0,0 +1,72 @@
+# pumpbot/ingest/events.py
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+
+@dataclass
+class Event:
+    src: str                        # source name, e.g. "pumpportal" / "solana_logs"
+    recv_ms: int                    # local receive time (ms)
+
+    @property
+    def key(self) -> str:
+        """dedupe key; events with the same key are delivered once."""
+        raise NotImplementedError
+
+
+@dataclass
+class NewTokenEvent(Event):
+    mint: str
+    name: str = "-"
+    signature: Optional[str] = None
+    raw: object = field(default=None, repr=False)     # decoded provider frame
+
+    @property
+    def key(self) -> str:
+        return f"new:{self.signature or self.mint}"
+
+
+@dataclass
+class MigrationEvent(Event):
+    mint: str
+    name: str = "-"
+    signature: Optional[str] = None
+    ts_raw: object = None           # provider timestamp as sent (s / ms / ISO), see watchers.migrated_pump._event_ts
+    raw: object = field(default=None, repr=False)     # decoded provider frame
+
+    @property
+    def key(self) -> str:
+        return f"migrate:{self.signature or self.mint}"
+
+
+@dataclass
+class LogsEvent(Event):
+    program: str
+    signature: str
+    logs: List[str] = field(default_factory=list)
+    err: object = None
+
+    @property
+    def key(self) -> str:
+        return f"logs:{self.program}:{self.signature}"
+
+    def has(self, needle: str) -> bool:
+        return any(needle in line for line in self.logs)
+
+
+@dataclass
+class TradeEvent(Event):
+    mint: str
+    signature: str
+    trader: str
+    side: str                       # "buy" / "sell"
+    sol_amount: float = 0.0
+    token_amount: float = 0.0
+    new_token_balance: Optional[float] = None   # trader's balance after the trade, when the provider sends it
+    market_cap_sol: Optional[float] = None
+    slot: Optional[int] = None
+    fee_sol: Optional[float] = None
+
+    @property
+    def key(self) -> str:
+        return f"trade:{self.signature}:{self.trader}"
@@ -0,0 +1,225 @@
+# pumpbot/ingest/sources.py
+# Upstream connections registered on the bus. One PumpPortal socket carries every
+# PumpPortal subscription; one Solana RPC socket carries every logsSubscribe.
+import json
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set
+
+from pumpbot.config import CONFIG, RPC_URL, PUMPPORTAL_KEY
+from pumpbot.ingest.bus import Emit, Source, bus
+from pumpbot.ingest.stream import run_stream
+from pumpbot.ingest.events import Event, LogsEvent, MigrationEvent, NewTokenEvent, TradeEvent
+from pumpbot.util import jsonfast
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+@dataclass
+class PumpPortalFrame:
+    """PumpPortal 一帧里用得到的字段（各接口对同一含义用的 key 不一样，全列上）。"""
+    mint: Optional[str] = None
+    token: Optional[str] = None
+    tokenAddress: Optional[str] = None
+    address: Optional[str] = None
+    txType: Optional[str] = None
+    type: Optional[str] = None
+    event: Optional[str] = None
+    signature: Optional[str] = None
+    tx: Optional[str] = None
+    txHash: Optional[str] = None
+    name: Optional[str] = None
+    timestamp: Any = None
+    ts: Any = None
+    time: Any = None
+    blockTime: Any = None
+    pool: Any = None
+    # subscribeTokenTrade
+    traderPublicKey: Optional[str] = None
+    solAmount: Optional[float] = None
+    tokenAmount: Optional[float] = None
+    newTokenBalance: Optional[float] = None
+    marketCapSol: Optional[float] = None
+    slot: Optional[int] = None
+    data: Optional["PumpPortalFrame"] = None
+
+
+def parse_pumpportal(frame: PumpPortalFrame) -> Optional[Event]:
+    """PumpPortal 一帧 → 事件；订阅回执、无 mint 的帧返回 None。"""
+    p = frame.data or frame
+    mint = p.mint or p.token or p.tokenAddress or p.address
+    if not mint:
+        return None
+    etype = (p.txType or p.type or p.event or "").lower()
+    sig = p.signature or p.tx or p.txHash
+    name = (p.name or "-").strip() or "-"
+    if etype == "create":
+        return NewTokenEvent(src="pumpportal", recv_ms=_now_ms(), mint=mint, name=name, signature=sig, raw=p)
+    if etype in ("buy", "sell") and sig and p.traderPublicKey:
+        return TradeEvent(src="pumpportal", recv_ms=_now_ms(), mint=mint, signature=sig, trader=p.traderPublicKey,
+                          side=etype, sol_amount=float(p.solAmount or 0), token_amount=float(p.tokenAmount or 0),
+                          new_token_balance=p.newTokenBalance, market_cap_sol=p.marketCapSol, slot=p.slot)
+    if "migrat" in etype or (not etype and p.pool is not None):
+        ts_raw = p.timestamp or p.ts or p.time or p.blockTime
+        return MigrationEvent(src="pumpportal", recv_ms=_now_ms(), mint=mint, name=name, signature=sig,
+                              ts_raw=ts_raw, raw=p)
+    return None
+
+
+class PumpPortalSource(Source):
+    name = "pumpportal"
+
+    def __init__(self):
+        super().__init__()
+        self.methods: Set[str] = set()
+        self.keys: Dict[str, Set[str]] = {}     # 按 key 订阅的 method（subscribeTokenTrade…）→ mint
+        self._ws = None
+
+    def _url(self) -> str:
+        ws_url = CONFIG["PUMP_WS"]
+        if PUMPPORTAL_KEY:
+            sep = "&" if "?" in ws_url else "?"
+            ws_url = f"{ws_url}{sep}api-key={PUMPPORTAL_KEY}"
+        return ws_url
+
+    async def want(self, method: str, keys: Optional[List[str]] = None):
+        """
+        订阅一个 PumpPortal method（subscribeMigration / subscribeNewToken…）；已连接则立即发送。
+        带 keys 的（subscribeTokenTrade 等）只补发新增的 key。
+        """
+        if keys is None:
+            if method in self.methods:
+                return
+            self.methods.add(method)
+            msg = {"method": method}
+        else:
+            have = self.keys.setdefault(method, set())
+            new = [k for k in keys if k not in have]
+            if not new:
+                return
+            have.update(new)
+            msg = {"method": method, "keys": new}
+        if self._ws is not None:
+            await self._ws.send(json.dumps(msg))
+
+    async def unwant(self, method: str, keys: List[str]):
+        """取消按 key 的订阅：subscribeTokenTrade → unsubscribeTokenTrade。"""
+        have = self.keys.get(method, set())
+        gone = [k for k in keys if k in have]
+        if not gone:
+            return
+        have.difference_update(gone)
+        if self._ws is not None:
+            await self._ws.send(json.dumps({"method": "un" + method[0].lower() + method[1:], "keys": gone}))
+
+    async def _on_connect(self, ws):
+        # 每次（重）连都重新发全部订阅
+        self._ws = ws
+        for m in sorted(self.methods):
+            await ws.send(json.dumps({"method": m}))
+        for m, keys in sorted(self.keys.items()):
+            if keys:
+                await ws.send(json.dumps({"method": m, "keys": sorted(keys)}))
+
+    def _on_disconnect(self):
+        self._ws = None
+
+    async def run(self, emit: Emit):
+        await run_stream(self, self._url, self._on_connect,
+                         lambda raw: parse_pumpportal(jsonfast.decode(raw, PumpPortalFrame)),
+                         emit, self._on_disconnect)
+
+
+@dataclass
+class _LogsValue:
+    signature: Optional[str] = None
+    logs: Optional[List[str]] = None
+    err: Any = None
+
+
+@dataclass
+class _LogsResult:
+    value: Optional[_LogsValue] = None
+
+
+@dataclass
+class _LogsParams:
+    subscription: Optional[int] = None
+    result: Optional[_LogsResult] = None
+
+
+@dataclass
+class _RpcWsMessage:
+    """RPC websocket 帧：订阅回执（id + result）或 logsNotification（params）。"""
+    id: Optional[int] = None
+    result: Any = None
+    params: Optional[_LogsParams] = None
+
+
+class SolanaLogsSource(Source):
+    """一个 RPC websocket 上对多个 program 做 logsSubscribe。"""
+
+    name = "solana_logs"
+
+    def __init__(self):
+        super().__init__()
+        self.programs: Set[str] = set()
+        self._ws = None
+        self._req_program: Dict[int, str] = {}
+        self._sub_program: Dict[int, str] = {}
+        self._next_id = 1
+
+    def _url(self) -> str:
+        if RPC_URL.startswith("http"):
+            return RPC_URL.replace("https://", "wss://").replace("http://", "ws://")
+        return RPC_URL
+
+    async def _subscribe(self, ws, program: str):
+        rid = self._next_id
+        self._next_id += 1
+        self._req_program[rid] = program
+        params = [{"mentions": [program]}, {"commitment": "confirmed"}]
+        await ws.send(json.dumps({"jsonrpc": "2.0", "id": rid, "method": "logsSubscribe", "params": params}))
+
+    async def watch(self, program: str):
+        if program in self.programs:
+            return
+        self.programs.add(program)
+        if self._ws is not None:
+            await self._subscribe(self._ws, program)
+
+    def _on_message(self, msg: "_RpcWsMessage") -> Optional[Event]:
+        if msg.id is not None and msg.result is not None:
+            # logsSubscribe 回执：request id → subscription id
+            program = self._req_program.pop(msg.id, None)
+            if program:
+                self._sub_program[msg.result] = program
+            return None
+        params = msg.params
+        program = self._sub_program.get(params.subscription) if params else None
+        value = params.result.value if params and params.result else None
+        if not program or not value or not value.signature:
+            return None
+        return LogsEvent(src=self.name, recv_ms=_now_ms(), program=program, signature=value.signature,
+                         logs=value.logs or [], err=value.err)
+
+    async def _on_connect(self, ws):
+        self._ws = ws
+        self._req_program.clear()
+        self._sub_program.clear()
+        for p in sorted(self.programs):
+            await self._subscribe(ws, p)
+
+    def _on_disconnect(self):
+        self._ws = None
+
+    async def run(self, emit: Emit):
+        await run_stream(self, self._url, self._on_connect,
+                         lambda raw: self._on_message(jsonfast.decode(raw, _RpcWsMessage)),
+                         emit, self._on_disconnect)
+
+
+pumpportal = bus.register(PumpPortalSource())
+solana_logs = bus.register(SolanaLogsSource())
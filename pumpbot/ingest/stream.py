@@ -0,0 +1,74 @@
+# pumpbot/ingest/stream.py
+import random
+import asyncio
+from typing import Any, Awaitable, Callable, Optional
+
+from pumpbot.config import CONFIG
+from pumpbot.ingest.events import Event
+
+# 新的 asyncio 客户端（websockets>=13 才有；13.x 顶层 websockets.connect 仍是 legacy 客户端）可以 recv(decode=False)：
+# 文本帧也原样给 bytes，省掉 UTF-8 解码成 str 再交给 JSON 解析的一次拷贝。legacy 客户端的 recv() 不收这个参数。
+try:
+    from websockets.asyncio.client import connect as _connect
+    _RECV_KW = {"decode": False}
+except ImportError:
+    from websockets import connect as _connect
+    _RECV_KW = {}
+
+
+async def run_stream(
+    src,
+    url: Callable[[], str],
+    on_connect: Callable[[Any], Awaitable[None]],
+    parse: Callable[[Any], Optional[Event]],
+    emit: Callable[[Event], Awaitable[None]],
+    on_disconnect: Callable[[], None] = lambda: None,
+):
+    """
+    自愈的 websocket 读循环（供 Source.run 使用）：
+      - 断线/异常后按指数退避 + full jitter 重连，重连成功后由 on_connect 重新订阅
+      - 心跳：STREAM_IDLE_SEC 内没收到任何帧就发 ping，STREAM_PONG_TIMEOUT_SEC 内没有 pong
+        视为假死，主动断开重连（连接正常只是没事件时不会误断）
+      - 计数写进 src.counters：received / parsed / ignored / dropped / reconnects / stalls
+    parse 收到的是原始帧（bytes，老版本 websockets 是 str），返回 None 表示控制帧（订阅回执等），抛异常表示无法解码。
+    """
+    c = src.counters
+    attempt = 0
+    while True:
+        try:
+            async with _connect(url(), ping_interval=CONFIG["STREAM_PING_SEC"]) as ws:
+                await on_connect(ws)
+                attempt = 0
+                while True:
+                    try:
+                        raw = await asyncio.wait_for(ws.recv(**_RECV_KW), timeout=CONFIG["STREAM_IDLE_SEC"])
+                    except asyncio.TimeoutError:
+                        try:
+                            pong = await ws.ping()
+                            await asyncio.wait_for(pong, timeout=CONFIG["STREAM_PONG_TIMEOUT_SEC"])
+                            continue
+                        except Exception:
+                            c["stalls"] += 1
+                            print(f"[ingest] {src.name}: heartbeat lost, reconnecting")
+                            break
+                    c["received"] += 1
+                    try:
+                        ev = parse(raw)
+                    except Exception:
+                        c["dropped"] += 1
+                        continue
+                    if ev is None:
+                        c["ignored"] += 1
+                        continue
+                    c["parsed"] += 1
+                    await emit(ev)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[ingest] {src.name} ws error: {e}")
+        finally:
+            on_disconnect()
+        c["reconnects"] += 1
+        delay = random.uniform(0, min(CONFIG["STREAM_BACKOFF_MAX_SEC"], CONFIG["STREAM_BACKOFF_BASE_SEC"] * 2 ** attempt))
+        attempt += 1
+        await asyncio.sleep(delay)
@@ -1,141 +1,211 @@
-import os, httpx
+import os
+import time
+from array import array
+from bisect import bisect_left
 from datetime import datetime, timezone, timedelta
-from typing import Dict, Any, List, Set
+from typing import Dict, Any, List, Optional, Set, Tuple
 
-from pumpbot.config import BITQUERY_API_KEY
+try:
+    import numpy as np  # pip install numpy
+except ImportError:
+    np = None
 
-BITQUERY_ENDPOINT = "https://streaming.bitquery.io/eap"
+from pumpbot.bitquery.compose import Metric, run_one
+from pumpbot.bitquery.eap import BITQUERY_GRAPHQL, BitqueryError, BqRow, iter_slot_pages, row_slot
+from pumpbot.config import BITQUERY_API_KEY
+from pumpbot.util import jsonfast
 
-# Pull BOTH DEX buys and SPL transfers for the mint (EAP ~last 8h)
-QUERY_EAP = """
-query ($token: String!) {
-  Solana {
-    trades: DEXTradeByTokens(
+# Pull BOTH DEX buys and SPL transfers for the mint (EAP ~last 8h), paged by slot
+_TRADES = ("DEXTradeByTokens", "Trade: { Currency: { MintAddress: { is: $token } } Side: { Type: { is: buy } } }")
+_TRANSFERS = ("Transfers", "Transfer: { Currency: { MintAddress: { is: $token } } }")
+_ROWS_FIELD = """
+    %s: %s(
       where: {
+        Block: { Slot: { gt: $after } }
         Transaction: { Result: { Success: true } }
-        Trade: {
-          Currency: { MintAddress: { is: $token } }
-          Side: { Type: { is: buy } }
-        }
+        %s
       }
       orderBy: { ascending: Block_Slot }
-      limit: { count: 100000 }
+      limit: { count: $limit }
     ) {
-      Block { Slot Time }
-      Transaction { Signer Signature }
+      Block { Slot }
+      Transaction { Signer }
     }
-    transfers: Transfers(
-      where: {
-        Transaction: { Result: { Success: true } }
-        Transfer: { Currency: { MintAddress: { is: $token } } }
-      }
-      orderBy: { ascending: Block_Slot }
-      limit: { count: 100000 }
-    ) {
-      Block { Slot Time }
-      Transaction { Signer Signature }
-    }
-  }
-}
 """
+_PAGE_VARS = {"token": "String!", "after": "Int!", "limit": "Int!"}
+
+
+def _page_query(field) -> str:
+    return "query ($token: String!, $after: Int!, $limit: Int!) {\n  Solana {" + _ROWS_FIELD % ("rows", *field) + "  }\n}\n"
+
+
+QUERY_TRADES_PAGE = _page_query(_TRADES)
+QUERY_TRANSFERS_PAGE = _page_query(_TRANSFERS)
+
+
+def _parse_head(sol: Dict[str, Any]) -> Tuple[List[BqRow], List[BqRow]]:
+    return (jsonfast.convert(sol.get("trades") or [], List[BqRow]),
+            jsonfast.convert(sol.get("transfers") or [], List[BqRow]))
+
+
+# first page of both streams, to ride along in a combined request:
+#   q.add(BUNDLER_HEAD, token=mint, after=0, limit=CONFIG["BITQUERY_PAGE_SIZE"]) → calc_bundlers_ratio_eap(mint, head=...)
+BUNDLER_HEAD = Metric("bundler_head", _ROWS_FIELD % ("__trades", *_TRADES) + _ROWS_FIELD % ("__transfers", *_TRANSFERS),
+                      _PAGE_VARS, _parse_head)
+
+
+# Share of the pair's transactions that landed in a (Jito) bundle within [t1, t2] — the screen's bundle filter
+_BUNDLE_SHARE_BODY = """
+    __total: Transactions(where: {Block: {Time: {since: $t1, till: $t2}}, AnyToAccount: {is: $addr}}) { count }
+    __bundled: Transactions(where: {Block: {Time: {since: $t1, till: $t2}}, AnyToAccount: {is: $addr}, Bundles: {Any: {BundleId: {not: null}}}}) { count }
+"""
+
+
+def _parse_share(sol: Dict[str, Any]) -> float:
+    total = int(((sol.get("total") or [{}])[0] or {}).get("count") or 0)
+    bundled = int(((sol.get("bundled") or [{}])[0] or {}).get("count") or 0)
+    return (bundled / total) if total > 0 else 0.0
+
+
+BUNDLE_SHARE = Metric("bundle_share", _BUNDLE_SHARE_BODY, {"addr": "String!", "t1": "DateTime", "t2": "DateTime"}, _parse_share)
+
+
+async def get_bundle_ratio_bitquery(pair_address: str, start_sec: int, end_sec: int) -> Optional[float]:
+    """pair 在 [start_sec, end_sec] 内的交易里 bundle 交易的占比；没有 key / 出错返回 None（不作为过滤条件）。"""
+    if not BITQUERY_API_KEY:
+        return None
+    try:
+        return await run_one(
+            BUNDLE_SHARE, timeout=20, endpoint=BITQUERY_GRAPHQL, addr=pair_address,
+            t1=time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(start_sec)),
+            t2=time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(end_sec)),
+        )
+    except BitqueryError as e:
+        print(f"Bitquery error: {e}")
+        return None
+
+
+# Axiom threshold: a slot is "bundled" when >= this many distinct signers touch the mint in it
+BUNDLE_MIN_SIGNERS = 4
+
 
 def _iso(dt: datetime) -> str:
     if dt.tzinfo is None:
         dt = dt.replace(tzinfo=timezone.utc)
     return dt.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
 
-def _slot_to_int(v) -> int | None:
-    try:
-        return int(str(v))
-    except Exception:
-        return None
-
-async def calc_bundlers_ratio_eap(token_mint: str) -> Dict[str, Any]:
+async def calc_bundlers_ratio_eap(
+    token_mint: str, head: Optional[Tuple[List[BqRow], List[BqRow]]] = None,
+) -> Dict[str, Any]:
     """
     Axiom-style Bundlers Ratio over EAP (~last 8h), no options:
       - Bundled slot: >= 4 distinct signers in same slot (trades + transfers).
       - Pattern filter: if a wallet appears in a bundled slot but its NEXT tx is unbundled, drop it.
       - Ratio = (# bundler wallets) / (# all wallets that transacted for this mint).
+    head: first (trades, transfers) pages already fetched via BUNDLER_HEAD; paging continues from there.
     """
-    api_key = BITQUERY_API_KEY
-    if not api_key:
+    if not BITQUERY_API_KEY:
         return {"ok": False, "error": "BITQUERY_API_KEY not set", "token_mint": token_mint}
 
-    headers = {"Content-Type": "application/json", "Authorization": f"Bearer {api_key}"}
-    payload = {"query": QUERY_EAP, "variables": {"token": token_mint}}
-
-    async with httpx.AsyncClient(timeout=45) as s:
-        r = await s.post(BITQUERY_ENDPOINT, json=payload, headers=headers)
-        if r.status_code != 200:
-            return {"ok": False, "error": f"HTTP {r.status_code}: {r.text[:300]}", "token_mint": token_mint}
-        j = r.json()
-        if "errors" in j:
-            return {"ok": False, "error": str(j["errors"])[:300], "token_mint": token_mint}
-
-    sol = (j.get("data") or {}).get("Solana") or {}
-    trades = sol.get("trades") or []
-    transfers = sol.get("transfers") or []
-
-    # unify events: (slot, signer, sig)
-    events: List[Dict[str, Any]] = []
-    for it in trades:
-        slot = _slot_to_int((it.get("Block") or {}).get("Slot"))
-        tx = it.get("Transaction") or {}
-        signer = tx.get("Signer")
-        sig = tx.get("Signature") or ""
-        if slot is not None and isinstance(signer, str):
-            events.append({"slot": slot, "signer": signer, "sig": sig})
-    for it in transfers:
-        slot = _slot_to_int((it.get("Block") or {}).get("Slot"))
-        tx = it.get("Transaction") or {}
-        signer = tx.get("Signer")
-        sig = tx.get("Signature") or ""
-        if slot is not None and isinstance(signer, str):
-            events.append({"slot": slot, "signer": signer, "sig": sig})
-
-    if not events:
-        t_end = datetime.now(timezone.utc); t_start = t_end - timedelta(hours=8)
-        return {
-            "ok": True, "token_mint": token_mint, "window_start": _iso(t_start), "window_end": _iso(t_end),
-            "total_wallets": 0, "bundler_wallets": 0, "bundled_slots": 0,
-            "bundlers_ratio": 0.0, "bundlers_ratio_pct": "0.00%"
-        }
-
-    # overall wallet set + per-slot signer sets
-    all_wallets: Set[str] = {e["signer"] for e in events}
-    by_slot: Dict[int, Set[str]] = {}
-    for e in events:
-        by_slot.setdefault(e["slot"], set()).add(e["signer"])
+    # columnar events: slot (int64) + signer interned to a dense id (int32); rows are dropped page by page
+    ids: Dict[str, int] = {}
+    slots = array("q")
+    signers = array("i")
+    try:
+        for query, first in zip((QUERY_TRADES_PAGE, QUERY_TRANSFERS_PAGE), head or (None, None)):
+            async for rows in iter_slot_pages(query, {"token": token_mint}, first=first):
+                for it in rows:
+                    tx = it.Transaction
+                    if tx is not None and isinstance(tx.Signer, str):
+                        slots.append(row_slot(it))
+                        signers.append(ids.setdefault(tx.Signer, len(ids)))
+    except BitqueryError as e:
+        return {"ok": False, "error": str(e)[:300], "token_mint": token_mint}
+
+    if not slots:
+        return _result(token_mint, 0, 0, 0)
+
+    bundlers, bundled_slots = count_bundlers(slots, signers, len(ids))
+    return _result(token_mint, len(ids), bundlers, bundled_slots)
+
+
+def count_bundlers(slots, signers, n_wallets: int) -> Tuple[int, int]:
+    """
+    (bundler wallets, bundled slots) for parallel slot / signer-id columns, signer ids in [0, n_wallets).
+    Uses NumPy when available; both paths give the same numbers.
+    """
+    if np is not None:
+        return _count_bundlers_np(np.asarray(slots, dtype=np.int64), np.asarray(signers, dtype=np.int32), n_wallets)
+    return _count_bundlers_py(slots, signers)
+
+
+def _count_bundlers_np(slots: "np.ndarray", signers: "np.ndarray", n_wallets: int) -> Tuple[int, int]:
+    if not len(slots):
+        return 0, 0
+    # pack (slot, signer) into one int64 key; sorting keys is much cheaper than lexsort / np.unique(axis=0)
+    base = int(slots.min())
+    span = int(slots.max()) - base + 1
+    n = max(int(n_wallets), 1)
+    if span * n >= 1 << 62:
+        # pathological slot range: fall back to the set-based path
+        return _count_bundlers_py(slots.tolist(), signers.tolist())
+    rel = slots - base
+
+    # distinct (slot, signer) pairs, slot-major
+    key = np.sort(rel * n + signers)
+    key = key[np.append(True, key[1:] != key[:-1])]
+    s = key // n
+
+    # Axiom threshold: >= 4 distinct signers in same slot (s is sorted, so each slot is a run)
+    new_slot = np.append(True, s[1:] != s[:-1])
+    starts = np.flatnonzero(new_slot)
+    counts = np.diff(np.append(starts, len(s)))
+    bundled_slots = s[starts][counts >= BUNDLE_MIN_SIGNERS]
+    if not len(bundled_slots):
+        return 0, 0
+
+    # same pairs wallet-major (slots ascending per wallet), flagged bundled / unbundled
+    key = np.sort((key % n) * span + s)
+    w, s = key // span, key % span
+    i = np.searchsorted(bundled_slots, s)
+    b = bundled_slots[np.minimum(i, len(bundled_slots) - 1)] == s
+
+    # a bundled slot followed by an unbundled one of the same wallet drops the wallet
+    bad = (w[1:] == w[:-1]) & b[:-1] & ~b[1:]
+    is_bundler = np.zeros(n, dtype=bool)
+    is_bundler[w[b]] = True
+    is_bundler[w[:-1][bad]] = False
+    return int(is_bundler.sum()), len(bundled_slots)
+
+
+def _count_bundlers_py(slots: List[int], signers: List[int]) -> Tuple[int, int]:
+    by_slot: Dict[int, Set[int]] = {}
+    for slot, signer in zip(slots, signers):
+        by_slot.setdefault(slot, set()).add(signer)
 
     # Axiom threshold: >= 4 signers in same slot
-    print(len(by_slot.keys()))
-    bundled_slots = [s for s, signers in by_slot.items() if len(signers) >= 4]
-    bundled_set = set(bundled_slots)
+    bundled_set = {s for s, ws in by_slot.items() if len(ws) >= BUNDLE_MIN_SIGNERS}
 
     # candidate bundlers = union of signers in bundled slots
-    candidates: Set[str] = set()
-    for s in bundled_slots:
+    candidates: Set[int] = set()
+    for s in bundled_set:
         candidates |= by_slot[s]
 
     # Axiom pattern filter: drop wallets if their NEXT tx is unbundled
-    filtered: Set[str] = set()
-    if candidates:
-        by_signer: Dict[str, List[Dict[str, Any]]] = {}
-        for e in events:
-            if e["signer"] in candidates:
-                by_signer.setdefault(e["signer"], []).append(e)
-        for signer, lst in by_signer.items():
-            lst.sort(key=lambda x: (x["slot"], x["sig"]))
-            bundled_idxs = [i for i, ev in enumerate(lst) if ev["slot"] in bundled_set]
-            if not bundled_idxs:
-                continue
-            drop = any((i + 1 < len(lst) and lst[i + 1]["slot"] not in bundled_set) for i in bundled_idxs)
-            if not drop:
-                filtered.add(signer)
+    by_signer: Dict[int, List[int]] = {}
+    for slot, signer in zip(slots, signers):
+        if signer in candidates:
+            by_signer.setdefault(signer, []).append(slot)
+    bundlers = 0
+    for lst in by_signer.values():
+        lst.sort()
+        if not any(a in bundled_set and b not in bundled_set for a, b in zip(lst, lst[1:])):
+            bundlers += 1
+    return bundlers, len(bundled_set)
 
+
+def _result(token_mint: str, total: int, bundlers: int, bundled_slots: int) -> Dict[str, Any]:
     t_end = datetime.now(timezone.utc); t_start = t_end - timedelta(hours=8)
-    total = len(all_wallets)
-    bundlers = len(filtered)
     ratio = (bundlers / total) if total else 0.0
 
     return {
@@ -145,7 +215,86 @@ async def calc_bundlers_ratio_eap(token_mint: str) -> Dict[str, Any]:
         "window_end": _iso(t_end),
         "total_wallets": total,
         "bundler_wallets": bundlers,
-        "bundled_slots": len(bundled_slots),
+        "bundled_slots": bundled_slots,
         "bundlers_ratio": ratio,
         "bundlers_ratio_pct": f"{ratio * 100:.2f}%"
-    }
\ No newline at end of file
+    }
+
+
+class BundlerEngine:
+    """
+    Incremental version of calc_bundlers_ratio_eap: feed (slot, signer) events in any order,
+    read result() at any time; it equals the batch function over the same events.
+
+    Per wallet the batch rule only depends on its sorted *distinct* slots: the wallet is a bundler
+    iff it has a bundled slot and no bundled slot is directly followed by an unbundled one.
+    So we keep, per wallet, its sorted slot list, how many of those slots are bundled, and how many
+    "bundled -> unbundled" adjacent pairs it has. A new event only touches the pairs around the
+    inserted slot; a slot turning bundled (once, at the 4th signer) only touches the pairs around
+    that slot for its 4 signers. In-order arrival appends, so the amortised cost is O(1) per event.
+    """
+
+    def __init__(self, token_mint: str = ""):
+        self.token_mint = token_mint
+        self.slot_signers: Dict[int, Set[str]] = {}
+        self.bundled: Set[int] = set()
+        self._slots: Dict[str, List[int]] = {}     # wallet -> sorted distinct slots
+        self._nb: Dict[str, int] = {}               # wallet -> bundled slots
+        self._bad: Dict[str, int] = {}              # wallet -> bundled->unbundled adjacent pairs
+        self.bundlers = 0
+        self.events = 0
+
+    def _t(self, a: Optional[int], b: Optional[int]) -> int:
+        return int(a is not None and b is not None and a in self.bundled and b not in self.bundled)
+
+    def _is_bundler(self, w: str) -> bool:
+        return self._nb.get(w, 0) > 0 and self._bad.get(w, 0) == 0
+
+    def _around(self, slots: List[int], i: int) -> int:
+        prev = slots[i - 1] if i > 0 else None
+        nxt = slots[i + 1] if i + 1 < len(slots) else None
+        return self._t(prev, slots[i]) + self._t(slots[i], nxt)
+
+    def add(self, slot: int, signer: str):
+        self.events += 1
+        slots = self._slots.get(signer)
+        if slots is None:
+            slots = self._slots[signer] = []
+            self._nb[signer] = 0
+            self._bad[signer] = 0
+        if slots and slots[-1] < slot:
+            i = len(slots)      # in-order fast path
+        else:
+            i = bisect_left(slots, slot)
+            if i < len(slots) and slots[i] == slot:
+                return          # wallet already in this slot: nothing changes
+        was = self._is_bundler(signer)
+        prev = slots[i - 1] if i > 0 else None
+        nxt = slots[i] if i < len(slots) else None
+        slots.insert(i, slot)
+        self._bad[signer] += self._around(slots, i) - self._t(prev, nxt)
+        self._nb[signer] += slot in self.bundled
+        self.bundlers += self._is_bundler(signer) - was
+
+        signers = self.slot_signers.setdefault(slot, set())
+        signers.add(signer)
+        if len(signers) == BUNDLE_MIN_SIGNERS and slot not in self.bundled:
+            self._mark_bundled(slot, signers)
+
+    def _mark_bundled(self, slot: int, signers: Set[str]):
+        before = {}
+        for w in signers:
+            slots = self._slots[w]
+            i = bisect_left(slots, slot)
+            before[w] = (i, self._is_bundler(w), self._around(slots, i))
+        self.bundled.add(slot)
+        for w, (i, was, old) in before.items():
+            self._bad[w] += self._around(self._slots[w], i) - old
+            self._nb[w] += 1
+            self.bundlers += self._is_bundler(w) - was
+
+    def ratio(self) -> float:
+        return self.bundlers / len(self._slots) if self._slots else 0.0
+
+    def result(self) -> Dict[str, Any]:
+        return _result(self.token_mint, len(self._slots), self.bundlers, len(self.bundled))
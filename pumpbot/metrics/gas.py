@@ -1,11 +1,12 @@
 # pumpbot/metrics/gas.py
-import os, httpx
+import os
 from decimal import Decimal
 from typing import Optional, Sequence, Dict, Any
 
+from pumpbot.bitquery.compose import Metric, run_one
+from pumpbot.bitquery.eap import BitqueryError
 from pumpbot.config import BITQUERY_API_KEY, CONFIG
-
-BITQUERY_ENDPOINT = "https://streaming.bitquery.io/eap"
+from pumpbot.chain.transactions import hydrate_transactions
 
 # Bundler (tip) addresses. If you already define them elsewhere, you can import that instead.
 DEFAULT_BUNDLERS: list[str] = CONFIG.get("BUNDLER_ADDRESSES") or [
@@ -19,11 +20,9 @@ DEFAULT_BUNDLERS: list[str] = CONFIG.get("BUNDLER_ADDRESSES") or [
     "96gYZGLnJYVFmbjzopPSU6QiEV5fGqZNyN9nmNhvrZU5",
 ]
 
-# One query, three blocks (no time filters)
-QUERY_TOTAL_FEES_NO_TIME = """
-query ($addr: String!, $tips: [String!]!) {
-  Solana {
-    AllTransactionFees: Transactions(
+# Three blocks (no time filters); a Metric so it can ride along in a combined Bitquery request
+_FEES_BODY = """
+    __AllTransactionFees: Transactions(
       where: { Transaction: { Accounts: { includes: { Address: { is: $addr } } } } }
     ) {
       total_transaction_fees_SOL: sum(of: Transaction_Fee)
@@ -31,7 +30,7 @@ query ($addr: String!, $tips: [String!]!) {
       transaction_count: count
     }
 
-    DEXTradingFees: DEXTradeByTokens(
+    __DEXTradingFees: DEXTradeByTokens(
       where: { Trade: { Currency: { MintAddress: { is: $addr } } } }
     ) {
       trading_fees_SOL: sum(of: Transaction_Fee)
@@ -39,7 +38,7 @@ query ($addr: String!, $tips: [String!]!) {
       trade_count: count
     }
 
-    BundleTippingFees: Transactions(
+    __BundleTippingFees: Transactions(
       where: {
         Transaction: {
           Accounts: {
@@ -55,14 +54,44 @@ query ($addr: String!, $tips: [String!]!) {
       bundle_fees_USD: sum(of: Transaction_FeeInUSD)
       bundle_count: count
     }
-  }
-}
 """
 
 def _d(x) -> Decimal:
     try: return Decimal(str(x or "0"))
     except: return Decimal("0")
 
+
+def _empty_fees() -> dict:
+    return {'total_sol': 0.0, 'parts': {'txn_sol': 0.0,'dex_sol': 0.0,'bundle_sol': 0.0}, 'counts': {'txn_count':0,'trade_count':0,'bundle_count':0}}
+
+
+def _parse_fees(sol: Dict[str, Any]) -> dict:
+    txn = (sol.get("AllTransactionFees") or [{}])[0]
+    dex = (sol.get("DEXTradingFees") or [{}])[0]
+    bun = (sol.get("BundleTippingFees") or [{}])[0]
+
+    txn_sol = float(_d(txn.get("total_transaction_fees_SOL")))
+    dex_sol = float(_d(dex.get("trading_fees_SOL")))
+    bun_sol = float(_d(bun.get("bundle_fees_SOL")))
+
+    return {
+        'total_sol': txn_sol + dex_sol + bun_sol,
+        'parts': {
+            'txn_sol': txn_sol,
+            'dex_sol': dex_sol,
+            'bundle_sol': bun_sol,
+        },
+        'counts': {
+            'txn_count': int(txn.get("transaction_count") or 0),
+            'trade_count': int(dex.get("trade_count") or 0),
+            'bundle_count': int(bun.get("bundle_count") or 0),
+        }
+    }
+
+
+FEES = Metric("fees", _FEES_BODY, {"addr": "String!", "tips": "[String!]!"}, _parse_fees)
+
+
 async def calc_total_fees_gmgn_style(
     client,                 # unused; kept for signature compatibility
     mint_address: str,      # <- only required parameter
@@ -89,43 +118,37 @@ async def calc_total_fees_gmgn_style(
     token = token or BITQUERY_API_KEY or os.getenv("BITQUERY_API_KEY")
     if not token:
         print("BITQUERY_API_KEY not set")
-        return {'total_sol': 0.0, 'parts': {'txn_sol': 0.0,'dex_sol': 0.0,'bundle_sol': 0.0}, 'counts': {'txn_count':0,'trade_count':0,'bundle_count':0}}
+        return _empty_fees()
 
     tips = list(tip_addrs or DEFAULT_BUNDLERS)
+    try:
+        return await run_one(FEES, api_key=token, addr=mint_address, tips=tips)
+    except BitqueryError as e:
+        print(f"[Bitquery] {e}")
+        return _empty_fees()
 
-    headers = {"Content-Type": "application/json", "Authorization": f"Bearer {token}"}
-    payload = {"query": QUERY_TOTAL_FEES_NO_TIME, "variables": {"addr": mint_address, "tips": tips}}
-
-    async with httpx.AsyncClient(timeout=45) as s:
-        r = await s.post(BITQUERY_ENDPOINT, json=payload, headers=headers)
-        if r.status_code != 200:
-            print(f"[Bitquery] HTTP {r.status_code}: {r.text[:400]}")
-            return {'total_sol': 0.0, 'parts': {'txn_sol': 0.0,'dex_sol': 0.0,'bundle_sol': 0.0}, 'counts': {'txn_count':0,'trade_count':0,'bundle_count':0}}
-        j = r.json()
-        if "errors" in j:
-            print(f"[Bitquery] errors: {j['errors']}")
-            return {'total_sol': 0.0, 'parts': {'txn_sol': 0.0,'dex_sol': 0.0,'bundle_sol': 0.0}, 'counts': {'txn_count':0,'trade_count':0,'bundle_count':0}}
-
-    sol = (j.get("data") or {}).get("Solana") or {}
 
-    txn = (sol.get("AllTransactionFees") or [{}])[0]
-    dex = (sol.get("DEXTradingFees") or [{}])[0]
-    bun = (sol.get("BundleTippingFees") or [{}])[0]
+async def calc_global_gas_fee_sol(
+    client,                 # unused; kept for signature compatibility
+    address: str,           # pair (or mint) address
+    since_ms: int,
+) -> float:
+    """
+    RPC 版全局 gas：address 自 since_ms 以来所有交易的 fee 之和（SOL）。
+    签名翻页和 getTransaction 流水线并发，速率由 rpc 令牌桶控制。
+    """
+    total = 0
 
-    txn_sol = float(_d(txn.get("total_transaction_fees_SOL")))
-    dex_sol = float(_d(dex.get("trading_fees_SOL")))
-    bun_sol = float(_d(bun.get("bundle_fees_SOL")))
+    def _on_tx(_sig: dict, tx: Optional[dict]):
+        nonlocal total
+        meta = (tx or {}).get("meta") or {}
+        total += int(meta.get("fee") or 0)
 
-    return {
-        'total_sol': txn_sol + dex_sol + bun_sol,
-        'parts': {
-            'txn_sol': txn_sol,
-            'dex_sol': dex_sol,
-            'bundle_sol': bun_sol,
-        },
-        'counts': {
-            'txn_count': int(txn.get("transaction_count") or 0),
-            'trade_count': int(dex.get("trade_count") or 0),
-            'bundle_count': int(bun.get("bundle_count") or 0),
-        }
-    }
+    try:
+        counts = await hydrate_transactions(address, _on_tx, since_ms=since_ms)
+    except Exception as e:
+        print(f"Gas calc error: {e}")
+        return total / 1e9
+    if counts["failed"]:
+        print(f"[gas] {address}: {counts['failed']}/{counts['signatures']} transactions not fetched")
+    return total / 1e9
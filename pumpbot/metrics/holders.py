@@ -1,10 +1,23 @@
 # pumpbot/metrics/holders.py
 import os
 import math
-import httpx
 from typing import Optional, List, Dict, Tuple
-from pumpbot.config import BIRDEYE_API_KEY
-from pumpbot.chain.token_accounts import filter_user_wallets  
+from solders.pubkey import Pubkey
+
+try:
+    import numpy as np  # pip install numpy
+except ImportError:
+    np = None
+
+from pumpbot.config import BIRDEYE_API_KEY, CONFIG
+from pumpbot.chain.token_accounts import (
+    aggregate_holder_slices,
+    decode_holder_slices,
+    filter_user_wallets,
+    get_holder_slices,
+)
+from pumpbot.util.http import http_get
+from pumpbot.util import jsonfast
 
 BASE = "https://public-api.birdeye.so/defi/v3/token/holder"
 
@@ -27,16 +40,15 @@ async def fetch_top_holders_birdeye(
 ) -> Tuple[List[Dict], Optional[int]]:
     holders: List[Dict] = []
 
-    async with httpx.AsyncClient(timeout=20) as s:
-        params = {
-            "address": mint,
-            "offset": offset,
-            "limit": limit,
-            "ui_amount_mode": ui_amount_mode,
-        }
-        r = await s.get(BASE, headers=_headers(), params=params)
-        r.raise_for_status()
-        j = r.json()
+    params = {
+        "address": mint,
+        "offset": offset,
+        "limit": limit,
+        "ui_amount_mode": ui_amount_mode,
+    }
+    r = await http_get(BASE, headers=_headers(), params=params, timeout=20)
+    r.raise_for_status()
+    j = jsonfast.loads(r.content)
 
     data = j.get("data") or {}
     items = data.get("items") or []
@@ -70,7 +82,50 @@ async def fetch_top_holders_birdeye(
     return holders
 
 async def compute_top_ratio(client, mint: str, top_n: int = 10) -> Optional[float]:
-    """Top-N 持币占比（返回 0..1）。"""
+    """Top-N 持币占比（返回 0..1）。HOLDERS_SOURCE=onchain 时走链上引擎，失败再退回 Birdeye。"""
+    if CONFIG["HOLDERS_SOURCE"] == "onchain" and np is not None:
+        try:
+            return await compute_top_ratio_onchain(client, mint, top_n)
+        except Exception as e:
+            print(f"[holders] on-chain top{top_n} failed for {mint}: {e}")
+            if not BIRDEYE_API_KEY:
+                return None
+    return await compute_top_ratio_birdeye(client, mint, top_n)
+
+
+async def compute_top_ratio_onchain(client, mint: str, top_n: int = 10) -> Optional[float]:
+    """
+    直接从链上算：getProgramAccounts 只取 owner + amount 40 字节，NumPy 整块解码并按 owner 汇总，
+    再从大到小挑出“个人钱包”（过滤池子 / PDA）取前 top_n。不消耗 Birdeye 额度。
+    """
+    from pumpbot.metrics.mcap import get_total_supply_ui
+
+    items = await get_holder_slices(mint)
+    owners, amounts = aggregate_holder_slices(decode_holder_slices(items))
+    if not len(owners):
+        return None
+
+    supply_ui, dec = await get_total_supply_ui(client, mint)
+    if supply_ui <= 0:
+        return None
+
+    # getMultipleAccounts 一次最多 100 个
+    step = min(100, max(50, top_n * 3))
+    picked: List[int] = []
+    for i in range(0, len(owners), step):
+        cands = [str(Pubkey(bytes(o))) for o in owners[i:i + step]]
+        allowed = set(await filter_user_wallets(cands))
+        picked.extend(int(a) for c, a in zip(cands, amounts[i:i + step]) if c in allowed)
+        if len(picked) >= top_n:
+            break
+
+    if not picked:
+        return None
+    return float(sum(picked[:top_n]) / 10 ** dec / supply_ui)
+
+
+async def compute_top_ratio_birdeye(client, mint: str, top_n: int = 10) -> Optional[float]:
+    """Top-N 持币占比（Birdeye holder 列表）。"""
     from pumpbot.metrics.mcap import get_total_supply_ui
 
     # 拉多一点，避免过滤掉 PDA 后不够 top_n
@@ -0,0 +1,110 @@
+# pumpbot/metrics/live.py
+# 单个 mint 迁移后的实时状态：每来一笔成交增量更新，任意时刻 O(1) 读指标，不再回查 Bitquery / RPC。
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Set
+
+from pumpbot.ingest.events import TradeEvent
+from pumpbot.metrics.bundler import BundlerEngine
+
+
+@dataclass
+class MintState:
+    mint: str
+    since_ms: int = field(default_factory=lambda: int(time.time() * 1000))
+
+    trades: int = 0
+    buys: int = 0
+    sells: int = 0
+    buy_sol: float = 0.0
+    sell_sol: float = 0.0
+    buyers: Set[str] = field(default_factory=set)
+    sellers: Set[str] = field(default_factory=set)
+
+    # 每个钱包的持仓（只统计 since_ms 之后看到的成交；provider 给了成交后余额就用它校准）
+    balances: Dict[str, float] = field(default_factory=dict)
+    holders: int = 0
+
+    # 成交落到的 slot → 该 slot 的签名者（slot 来自事件本身或之后补查的交易），bundler 比例随之增量更新
+    bundler: BundlerEngine = field(default_factory=BundlerEngine)
+    # 交易费按签名算一次：同一笔交易里可能有多条成交事件（不同 trader / 多次 swap）
+    fee_sol: float = 0.0
+    fee_txs: int = 0
+    fee_sigs: Set[str] = field(default_factory=set)
+
+    last_price_sol: Optional[float] = None
+    market_cap_sol: Optional[float] = None
+    last_trade_ms: Optional[int] = None
+
+    def __post_init__(self):
+        self.bundler.token_mint = self.mint
+
+    def apply(self, ev: TradeEvent):
+        self.trades += 1
+        self.last_trade_ms = ev.recv_ms
+        if ev.side == "buy":
+            self.buys += 1
+            self.buy_sol += ev.sol_amount
+            self.buyers.add(ev.trader)
+            delta = ev.token_amount
+        else:
+            self.sells += 1
+            self.sell_sol += ev.sol_amount
+            self.sellers.add(ev.trader)
+            delta = -ev.token_amount
+        prev = self.balances.get(ev.trader, 0.0)
+        bal = ev.new_token_balance if ev.new_token_balance is not None else max(0.0, prev + delta)
+        self._set_balance(ev.trader, prev, bal)
+        if ev.token_amount > 0 and ev.sol_amount > 0:
+            self.last_price_sol = ev.sol_amount / ev.token_amount
+        if ev.market_cap_sol is not None:
+            self.market_cap_sol = ev.market_cap_sol
+        if ev.slot is not None:
+            self.add_slot(ev.slot, ev.trader)
+        if ev.fee_sol is not None:
+            self.add_fee(ev.fee_sol, ev.signature)
+
+    def _set_balance(self, owner: str, prev: float, bal: float):
+        if prev <= 0 < bal:
+            self.holders += 1
+        elif bal <= 0 < prev:
+            self.holders -= 1
+        if bal > 0:
+            self.balances[owner] = bal
+        else:
+            self.balances.pop(owner, None)
+
+    def add_slot(self, slot: int, signer: str):
+        self.bundler.add(slot, signer)
+
+    def add_fee(self, fee_sol: float, signature: str):
+        if signature in self.fee_sigs:
+            return
+        self.fee_sigs.add(signature)
+        self.fee_sol += fee_sol
+        self.fee_txs += 1
+
+    def snapshot(self) -> dict:
+        return {
+            "mint": self.mint,
+            "since_ms": self.since_ms,
+            "trades": self.trades,
+            "buys": self.buys,
+            "sells": self.sells,
+            "buyers": len(self.buyers),
+            "sellers": len(self.sellers),
+            "buy_sol": self.buy_sol,
+            "sell_sol": self.sell_sol,
+            "volume_sol": self.buy_sol + self.sell_sol,
+            "net_flow_sol": self.buy_sol - self.sell_sol,
+            "holders": self.holders,
+            "slots": len(self.bundler.slot_signers),
+            "bundled_slots": len(self.bundler.bundled),
+            "bundler_wallets": self.bundler.bundlers,
+            "bundlers_ratio": self.bundler.ratio(),
+            "fee_sol": self.fee_sol,
+            "fee_txs": self.fee_txs,
+            "price_sol": self.last_price_sol,
+            "market_cap_sol": self.market_cap_sol,
+            "last_trade_ms": self.last_trade_ms,
+        }
@@ -1,10 +1,17 @@
 from typing import Tuple, Optional
 from solders.pubkey import Pubkey
-from pumpbot.dex.dexscreener import get_token_pair_from_dexscreener
+from pumpbot.dex.dexscreener import get_token_pair_from_dexscreener, get_pair_detail
 from pumpbot.birdeye.price import get_birdeye_price_usd
+from pumpbot.util import ratelimit
+from pumpbot.util.singleflight import singleflight
+from pumpbot.util.cache import cached
 
 
+# client 不参与 key：同一 mint 的并发 supply 查询共享一次 RPC，结果缓存几分钟
+@cached("supply", key=lambda client, mint: mint)
+@singleflight("rpc", key=lambda client, mint: mint)
 async def get_total_supply_ui(client, mint: str) -> tuple[float, int]:
+    await ratelimit.acquire("rpc")
     info = await client.get_token_supply(Pubkey.from_string(mint))
     val = info.value
     dec = int(val.decimals)
@@ -18,8 +25,10 @@ async def fast_mcap_usd(client, mint: str) -> Tuple[Optional[float], Optional[fl
     be = await get_birdeye_price_usd(mint)
     if be and supply > 0:
         return be * supply, be
+    # pair 本身是永久缓存的，价格要从短 TTL 的 pair detail 取
     pair = await get_token_pair_from_dexscreener(mint)
-    price = float(pair.get("priceUsd") or 0) if pair else 0
+    detail = await get_pair_detail(pair["pairAddress"]) if pair and pair.get("pairAddress") else None
+    price = float((detail or pair or {}).get("priceUsd") or 0)
     if price > 0 and supply > 0:
         return price * supply, price
     return None, None
@@ -1,9 +1,9 @@
 # pumpbot/metrics/migrated_features.py
 from __future__ import annotations
-import asyncio, time, inspect
+import asyncio, time
 from typing import Optional, Dict, Any, Tuple
 
-from pumpbot.chain.rpc import get_client
+from pumpbot.chain.rpc import acquire_client
 from pumpbot.metrics.mcap import fast_mcap_usd
 from pumpbot.metrics.holders import compute_top10_holder_ratio
 from pumpbot.metrics.bundlers import calc_bundler_share, DEFAULT_BUNDLERS
@@ -16,14 +16,6 @@ def _now_ms() -> int:
 
 
 
-async def _maybe_await(v):
-    return await v if inspect.isawaitable(v) else v
-
-async def _get_client():
-    # 兼容 get_client() 可能是 sync 或 async 的两种实现
-    c = get_client()
-    return await _maybe_await(c)
-
 async def _resolve_pair(mint: str, pair_hint: str | None, retries: int = 3, delay: float = 0.8):
     """
     返回 (resolved_pair_addr, pair_info)。
@@ -145,29 +137,18 @@ async def compute_migrated_features(
         else:
             start_ms = until_ms - 24 * 3600 * 1000  # last24h
 
-    client = await _get_client()
-    
     resolved_pair, pair_info = await _resolve_pair(mint, pair)
 
     addr_for_bundler = resolved_pair or mint
 
-    # 并发拿数
-    (mcap_usd, price_usd), top10_ratio, (bundler_ratio, has_jito, bundler_summary), gas_sol= await asyncio.gather(
-        _mcap_price(client, mint),
-        _holders(client, mint),
-        _bundlers(addr_for_bundler, start_ms, until_ms),
-        _gas(mint, start_ms),
-    )
-
-    # 关闭 client（如果有 close 且是可等待的）
-    try:
-        closer = getattr(client, "close", None)
-        if closer:
-            v = closer()
-            if inspect.isawaitable(v):
-                await v
-    except Exception:
-        pass
+    # 并发拿数（client 来自共享池，用完归还，不在这里 close）
+    async with acquire_client() as client:
+        (mcap_usd, price_usd), top10_ratio, (bundler_ratio, has_jito, bundler_summary), gas_sol= await asyncio.gather(
+            _mcap_price(client, mint),
+            _holders(client, mint),
+            _bundlers(addr_for_bundler, start_ms, until_ms),
+            _gas(mint, start_ms),
+        )
 
     return {
         "mint": mint,
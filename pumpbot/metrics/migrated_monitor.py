@@ -1,72 +1,52 @@
 import asyncio
-import json
-import websockets
-from solders.signature import Signature
-from solana.rpc.async_api import AsyncClient
+from pumpbot.chain.tx_waiter import on_transaction, wait_for_transaction
+from pumpbot.ingest.bus import bus
+from pumpbot.ingest.events import LogsEvent
+from pumpbot.ingest.sources import solana_logs
 
-HELIUS_API_KEY = "670abfb5-80f8-4732-8f77-9d96813e8198"
 BONDING_CURVE_PROGRAM = "dbcij3LWUppWqq96dh6gJWwBifmcGfLSB5D4DuSMaqN"
 
-# Initialize Async Solana RPC client
-RPC_ENDPOINT = f"https://mainnet.helius-rpc.com/?api-key={HELIUS_API_KEY}"
-
-async def extract_token_mint(tx_sig, client):
-    """Extract the newly created token mint from transaction with retry logic"""
+async def extract_token_mint(tx_sig):
+    """Extract the newly created token mint from transaction"""
     try:
-        sig = Signature.from_string(str(tx_sig)) if isinstance(tx_sig, str) else tx_sig
-        
-        # Retry with exponential backoff (transaction needs time to be available)
-        for attempt in range(8):
-            await asyncio.sleep(1 * (attempt + 1))  # 1s, 2s, 3s, 4s, 5s, 6s, 7s, 8s
-            
-            try:
-                tx = await client.get_transaction(
-                    sig,
-                    max_supported_transaction_version=0,
-                    encoding="jsonParsed"
-                )
-                
-                if tx.value:
-                    mint_address = parse_token_mint(tx.value)
-                    if mint_address:
-                        print(f"   🪙 Token Mint: {mint_address}")
-                        print(f"   🔗 DexScreener: https://dexscreener.com/solana/{mint_address}")
-                        return mint_address
-                    else:
-                        print(f"   ⚠️  Could not extract token mint from transaction")
-                        return None
-            except Exception as e:
-                if attempt < 7:  # Don't print error on last attempt
-                    print(f"   ⏳ Attempt {attempt + 1}/8: Transaction not ready yet...")
-                continue
-        
-        print(f"   ❌ Transaction not available after 8 retries")
-        return None
-        
+        # Shared timer wheel retries until the transaction is available (batched getTransaction per tick)
+        return _report_mint(await wait_for_transaction(str(tx_sig)))
     except Exception as e:
         print(f"   ❌ Error extracting mint: {e}")
         return None
 
-def parse_token_mint(tx_value):
+def _report_mint(tx):
+    if not tx:
+        print(f"   ❌ Transaction not available after retries")
+        return None
+
+    mint_address = parse_token_mint(tx)
+    if mint_address:
+        print(f"   🪙 Token Mint: {mint_address}")
+        print(f"   🔗 DexScreener: https://dexscreener.com/solana/{mint_address}")
+        print(f"   ✅ Token extracted successfully!\n")
+        return mint_address
+    else:
+        print(f"   ⚠️  Could not extract token mint from transaction\n")
+        return None
+
+def parse_token_mint(tx: dict):
     """
-    Parse the token mint from the transaction.
-    The new token mint appears in post_token_balances.
+    Parse the token mint from the transaction (getTransaction result, json/base64 encoding).
+    The new token mint appears in meta.postTokenBalances.
     """
     try:
-        meta = tx_value.transaction.meta
-        
-        if not meta or not hasattr(meta, 'post_token_balances'):
-            return None
-        
-        if not meta.post_token_balances:
+        meta = tx.get("meta")
+
+        if not meta or not meta.get("postTokenBalances"):
             return None
 
         # Find the token mint that is NOT wrapped SOL
-        for balance in meta.post_token_balances:
-            mint = str(balance.mint)
-            decimals = balance.ui_token_amount.decimals
+        for balance in meta["postTokenBalances"]:
+            mint = balance.get("mint")
+            decimals = (balance.get("uiTokenAmount") or {}).get("decimals")
             # Exclude wrapped SOL
-            if mint != "So11111111111111111111111111111111111111112" and decimals == 6:
+            if mint and mint != "So11111111111111111111111111111111111111112" and decimals == 6:
                 # This is the newly created token!
                 return mint
         
@@ -76,84 +56,38 @@ def parse_token_mint(tx_value):
         print(f"   ⚠️  Error parsing mint: {e}")
         return None
 
-async def listen_for_migrations():
-    url = f"wss://mainnet.helius-rpc.com/?api-key={HELIUS_API_KEY}"
-    
-    # Create async client for RPC calls
-    async with AsyncClient(RPC_ENDPOINT) as client:
-        async with websockets.connect(url) as ws:
-            subscription = {
-                "jsonrpc": "2.0",
-                "id": 1,
-                "method": "logsSubscribe",
-                "params": [
-                    {
-                        "mentions": [BONDING_CURVE_PROGRAM]
-                    },
-                    {
-                        "commitment": "confirmed"
-                    }
-                ]
-            }
+def _is_completed_migration(ev: LogsEvent) -> bool:
+    # Look for the migration instruction; pool created means migration is complete
+    if ev.program != BONDING_CURVE_PROGRAM or ev.err:
+        return False
+    if not ev.has("Program log: Instruction: MigrationDammV2"):
+        return False
+    return any("create pool" in log.lower() for log in ev.logs)
 
-            await ws.send(json.dumps(subscription))
-            first_response = await ws.recv()
-            response = json.loads(first_response)
-            
-            if "result" in response:
-                print(f"✅ Monitoring Meteora migrations...")
-                print(f"⏰ Waiting for MigrationDammV2 instructions...\n")
-            else:
-                print(f"❌ Subscription failed: {response}")
-                return
+def _report_migration(signature):
+    print(f"🚀 TOKEN MIGRATED!")
+    print(f"   📝 Tx: https://solscan.io/tx/{signature}")
+    print(f"   ✅ Pool created on Meteora DAMM v2")
 
-            while True:
-                try:
-                    message = await ws.recv()
-                    data = json.loads(message)
-                    
-                    if "params" in data and "result" in data["params"]:
-                        result = data["params"]["result"]["value"]
-                        signature = result.get("signature")
-                        logs = result.get("logs", [])
-                        err = result.get("err")
-                        
-                        # Look for the migration instruction
-                        is_migration = any("Program log: Instruction: MigrationDammV2" in log for log in logs)
-                        
-                        if is_migration and not err:
-                            # Check if pool was created (this means migration is complete)
-                            pool_created = any("create pool" in log.lower() for log in logs)
-                            
-                            if pool_created:
-                                print(f"🚀 TOKEN MIGRATED!")
-                                print(f"   📝 Tx: https://solscan.io/tx/{signature}")
-                                print(f"   ✅ Pool created on Meteora DAMM v2")
-                                
-                                # Extract token mint address with retry logic
-                                token_mint = await extract_token_mint(signature, client)
-                                
-                                if token_mint:
-                                    print(f"   ✅ Token extracted successfully!")
-                                
-                                print()
-                                
-                except websockets.exceptions.ConnectionClosed:
-                    print("⚠️  Connection closed. Reconnecting...")
-                    await asyncio.sleep(5)
-                    break
-                except Exception as e:
-                    print(f"❌ Error: {e}")
-                    await asyncio.sleep(1)
+    # Token mint is reported once the transaction is available (shared timer wheel, no task per signature)
+    on_transaction(signature, _report_mint)
+
+async def listen_for_migrations():
+    # DBC logs come off the shared ingestion bus (one RPC websocket, reconnects handled there)
+    sub = bus.subscribe(LogsEvent, where=_is_completed_migration)
+    await solana_logs.watch(BONDING_CURVE_PROGRAM)
+    bus.start(solana_logs.name)
+    print(f"✅ Monitoring Meteora migrations...")
+    print(f"⏰ Waiting for MigrationDammV2 instructions...\n")
+
+    try:
+        async for ev in sub:
+            _report_migration(ev.signature)
+    finally:
+        sub.close()
 
 if __name__ == "__main__":
-    while True:
-        try:
-            asyncio.run(listen_for_migrations())
-        except KeyboardInterrupt:
-            print("\n👋 Stopped monitoring")
-            break
-        except Exception as e:
-            print(f"Connection error: {e}")
-            print("Reconnecting in 5 seconds...")
-            asyncio.sleep(5)
\ No newline at end of file
+    try:
+        asyncio.run(listen_for_migrations())
+    except KeyboardInterrupt:
+        print("\n👋 Stopped monitoring")
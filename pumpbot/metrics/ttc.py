@@ -1,53 +1,48 @@
 # pumpbot/metrics/ttc.py
 from __future__ import annotations
-from typing import Optional, Dict
+from typing import Optional
 from solders.pubkey import Pubkey
-from pumpbot.chain.rpc import get_client
-import asyncio
-import time
+from pumpbot.chain.rpc import acquire_client
+from pumpbot.util import ratelimit
+from pumpbot.util.cache import cached
+from pumpbot.util.singleflight import singleflight
 
-# 简易内存缓存（birth_ms 一般不变），可按需换成 Redis/DB
-_birth_cache: Dict[str, int] = {}
-_cache_lock = asyncio.Lock()
-_CACHE_TTL_SEC = 24 * 3600
-_cache_ts: Dict[str, float] = {}
 
 async def _get_mint_creation_ms(mint: str) -> Optional[int]:
     """
     遍历 getSignaturesForAddress 直到最早一页，取最早一条的 block_time 作为 mint birth。
     返回毫秒（ms）；拿不到返回 None。
     """
-    client = await get_client()
     before = None
     oldest_ms = None
-    while True:
-        resp = await client.get_signatures_for_address(
-            Pubkey.from_string(mint), before=before, limit=1000
-        )
-        sigs = resp.value or []
-        if not sigs:
-            break
-        last = sigs[-1] 
-        if last.block_time is not None:
-            oldest_ms = int(last.block_time) * 1000
-        before = last.signature
-        if len(sigs) < 1000:
-            break
+    async with acquire_client() as client:
+        while True:
+            await ratelimit.acquire("rpc")
+            resp = await client.get_signatures_for_address(
+                Pubkey.from_string(mint), before=before, limit=1000
+            )
+            sigs = resp.value or []
+            if not sigs:
+                break
+            last = sigs[-1] 
+            if last.block_time is not None:
+                oldest_ms = int(last.block_time) * 1000
+            before = last.signature
+            if len(sigs) < 1000:
+                break
     return oldest_ms
 
+# birth_ms 不会变：TTL/LRU 缓存 + 本地 store + 并发去重，拿不到时只短暂负缓存
+@cached("mint_birth", key=lambda mint: mint, persist=True)
+@singleflight("rpc")
 async def get_birth_ms_cached(mint: str) -> Optional[int]:
-    now = time.time()
-    async with _cache_lock:
-        ts = _cache_ts.get(mint)
-        if mint in _birth_cache and ts and (now - ts) < _CACHE_TTL_SEC:
-            return _birth_cache[mint]
-    # miss → 查链
-    birth = await _get_mint_creation_ms(mint)
-    async with _cache_lock:
-        if birth:
-            _birth_cache[mint] = birth
-            _cache_ts[mint] = now
-    return birth
+    # miss → 查链（只有进程启动前创建、索引里没有的 mint 才会走到这里）
+    return await _get_mint_creation_ms(mint)
+
+
+def record_birth(mint: str, birth_ms: int):
+    """由 watchers.births 从创建流里喂入：mint 的 birth 提前写进索引。"""
+    get_birth_ms_cached.prime(mint, int(birth_ms))
 
 def humanize_duration(ms: Optional[int]) -> str:
     if not ms or ms < 0:
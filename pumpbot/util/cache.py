@@ -0,0 +1,136 @@
+# pumpbot/util/cache.py
+import time
+import functools
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+from pumpbot.config import CONFIG
+from pumpbot.util.store import store
+
+MISS = object()
+
+
+class TTLCache:
+    """
+    进程内 TTL + LRU 缓存（单事件循环内使用，不需要锁）。
+    - ttl=None 表示永不过期（只会被 LRU 挤掉）
+    - 值为 None 视为“查无结果”，按 negative_ttl 单独缓存；negative_ttl=0 则不缓存
+    """
+
+    def __init__(self, name: str, ttl: Optional[float], negative_ttl: float = 0, max_entries: int = 10000):
+        self.name = name
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Any:
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return MISS
+        expires_at, value = item
+        if expires_at and expires_at < time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return MISS
+        self._data.move_to_end(key)
+        if value is None:
+            self.negative_hits += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        ttl = self.negative_ttl if value is None else self.ttl
+        if ttl is not None and ttl <= 0:
+            return
+        self._data[key] = (time.monotonic() + ttl if ttl else 0.0, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.negative_hits + self.misses
+        return {
+            "entries": len(self._data),
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round((self.hits + self.negative_hits) / lookups, 3) if lookups else 0.0,
+        }
+
+
+_caches: Dict[str, TTLCache] = {}
+
+
+def get_cache(kind: str) -> TTLCache:
+    """按 CONFIG["CACHE"][kind] 的配置拿（或建）一个命名缓存。"""
+    c = _caches.get(kind)
+    if c is None:
+        cfg = CONFIG["CACHE"].get(kind, {})
+        c = _caches[kind] = TTLCache(
+            kind,
+            ttl=cfg.get("ttl"),
+            negative_ttl=cfg.get("negative_ttl", 0),
+            max_entries=cfg.get("max_entries", 10000),
+        )
+    return c
+
+
+def cached(kind: str, key: Callable[..., Hashable] | None = None, persist: bool = False):
+    """
+    @cached("supply", key=lambda client, mint: mint)
+    async def get_total_supply_ui(client, mint): ...
+
+    只缓存正常返回值（None 走负缓存）；抛异常不缓存。
+    persist=True 只用于不会变的事实：内存未命中时先查本地 store，
+    拿到的非 None 结果异步写回 store（重启后直接命中）。
+    """
+    def deco(fn):
+        c = get_cache(kind)
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            k = key(*args, **kwargs) if key else (args, tuple(sorted(kwargs.items())))
+            v = c.get(k)
+            if v is not MISS:
+                return v
+            use_store = persist and CONFIG["STORE_ENABLED"]
+            skey = k if isinstance(k, str) else repr(k)
+            if use_store:
+                v = await store.get(kind, skey)
+                if v is not None:
+                    c.set(k, v)
+                    return v
+            v = await fn(*args, **kwargs)
+            c.set(k, v)
+            if use_store and v is not None:
+                store.put(kind, skey, v)
+            return v
+
+        def prime(k: Hashable, v: Any):
+            """外部已知结果（如实时流里看到的）直接写入缓存/store，之后调用 O(1) 命中。"""
+            c.set(k, v)
+            if persist and CONFIG["STORE_ENABLED"] and v is not None:
+                store.put(kind, k if isinstance(k, str) else repr(k), v)
+
+        wrapper.cache = c
+        wrapper.prime = prime
+        return wrapper
+    return deco
+
+
+def stats() -> Dict[str, dict]:
+    return {name: c.stats() for name, c in _caches.items()}
@@ -0,0 +1,240 @@
+# pumpbot/util/dag.py
+import time
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+@dataclass
+class Stage:
+    name: str
+    fn: Callable[..., Awaitable[Any]]   # fn(**{dep: value})
+    deps: Tuple[str, ...]
+    cost: float = 1.0                   # 没有样本时的预估耗时（ms）
+    samples: int = 0
+    mean_ms: float = 0.0                # 实测平均耗时（被取消的不计）
+
+    def est_ms(self) -> float:
+        return self.mean_ms if self.samples else self.cost
+
+
+@dataclass
+class Check:
+    name: str
+    fn: Callable[..., bool]             # fn(*values of needs) -> 是否通过
+    needs: Tuple[str, ...]
+    hard: bool = False                  # hard：不通过就一定提前结束（不管 short_circuit）
+    evaluated: int = 0
+    rejected: int = 0
+
+    def reject_rate(self) -> float:
+        # Laplace 平滑：没样本时按 50% 算，避免 0 / 1 把顺序钉死
+        return (self.rejected + 1) / (self.evaluated + 2)
+
+
+@dataclass
+class Outcome:
+    values: Dict[str, Any]
+    passed: bool
+    rejected_by: Optional[str] = None
+    checks: Dict[str, bool] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+    timings_ms: Dict[str, float] = field(default_factory=dict)
+    cancelled: List[str] = field(default_factory=list)
+
+
+class FeatureGraph:
+    """
+    声明式的特征依赖图：
+        g = FeatureGraph("migration")
+
+        @g.stage("pair", "mint", cost=300)
+        async def pair(mint): ...
+
+        @g.check("has_pair", "pair", hard=True)
+        def has_pair(pair): return pair is not None
+
+    run(mint=...) 时每个 check 在它需要的值到齐时马上判定，不通过就取消所有还在跑的 stage 并返回
+    （short_circuit=False 时只有 hard check 会提前结束，其余 stage 全部并发跑完）。
+    stage 抛异常时值记为 None，错误写进 Outcome.errors。
+
+    short_circuit=True 时按 plan() 的顺序推进：只启动当前（及后 prefetch 个）check 需要的 stage，
+    前面的 check 通过了才为后面的花钱。plan 按“边际耗时 / 拒绝率”贪心排序（越便宜、越常拒绝越靠前），
+    耗时和拒绝率来自历史运行；每 replan_every 次运行才重排一次，两次重排之间顺序固定，同分按声明顺序。
+    """
+
+    def __init__(self, name: str, prefetch: int = 0, replan_every: int = 20):
+        self.name = name
+        self.prefetch = prefetch
+        self.replan_every = max(1, replan_every)
+        self.stages: Dict[str, Stage] = {}
+        self.checks: Dict[str, Check] = {}
+        self.runs = 0
+        self._plan: Optional[List[str]] = None
+
+    def stage(self, name: str, *deps: str, cost: float = 1.0):
+        def deco(fn):
+            self.stages[name] = Stage(name, fn, deps, cost)
+            self._plan = None
+            return fn
+        return deco
+
+    def check(self, name: str, *needs: str, hard: bool = False):
+        def deco(fn):
+            self.checks[name] = Check(name, fn, needs, hard)
+            self._plan = None
+            return fn
+        return deco
+
+    def validate(self, inputs: Tuple[str, ...] = ()):
+        known = set(inputs) | set(self.stages)
+        for node in list(self.stages.values()) + list(self.checks.values()):
+            deps = node.deps if isinstance(node, Stage) else node.needs
+            missing = [d for d in deps if d not in known]
+            if missing:
+                raise ValueError(f"{self.name}: {node.name} depends on unknown {missing}")
+        # 拓扑排序查环
+        indeg = {n: sum(d in self.stages for d in s.deps) for n, s in self.stages.items()}
+        ready = [n for n, k in indeg.items() if k == 0]
+        seen = 0
+        while ready:
+            n = ready.pop()
+            seen += 1
+            for m, s in self.stages.items():
+                if n in s.deps:
+                    indeg[m] -= 1
+                    if indeg[m] == 0:
+                        ready.append(m)
+        if seen != len(self.stages):
+            raise ValueError(f"{self.name}: dependency cycle")
+
+    # ---------- planning ----------
+
+    def _closure(self, names) -> set:
+        """names 直接/间接依赖的全部 stage。"""
+        out, todo = set(), [n for n in names if n in self.stages]
+        while todo:
+            n = todo.pop()
+            if n not in out:
+                out.add(n)
+                todo += [d for d in self.stages[n].deps if d in self.stages]
+        return out
+
+    def _build_plan(self) -> List[str]:
+        order: List[str] = []
+        paid: set = set()
+        left = list(self.checks)    # 声明顺序，min() 同分取第一个 → 确定性
+        while left:
+            def rank(name):
+                c = self.checks[name]
+                marginal = sum(self.stages[s].est_ms() for s in self._closure(c.needs) - paid)
+                return marginal / c.reject_rate()
+            best = min(left, key=rank)
+            left.remove(best)
+            order.append(best)
+            paid |= self._closure(self.checks[best].needs)
+        return order
+
+    def plan(self) -> List[dict]:
+        """当前的 check 执行顺序及其依据（供查看/打日志）。"""
+        if self._plan is None:
+            self._plan = self._build_plan()
+        paid: set = set()
+        rows = []
+        for name in self._plan:
+            c = self.checks[name]
+            need = self._closure(c.needs)
+            marginal = sum(self.stages[s].est_ms() for s in need - paid)
+            paid |= need
+            rows.append({
+                "check": name, "hard": c.hard,
+                "evaluated": c.evaluated, "reject_rate": round(c.reject_rate(), 3),
+                "marginal_ms": round(marginal, 1), "rank": round(marginal / c.reject_rate(), 1),
+            })
+        return rows
+
+    def _record(self, out: Outcome):
+        for name, ms in out.timings_ms.items():
+            if name in out.errors:
+                continue
+            s = self.stages[name]
+            s.samples += 1
+            s.mean_ms += (ms - s.mean_ms) / s.samples
+        for name, ok in out.checks.items():
+            c = self.checks[name]
+            c.evaluated += 1
+            c.rejected += not ok
+        self.runs += 1
+        if self._plan is None or self.runs % self.replan_every == 0:
+            self._plan = self._build_plan()
+
+    # ---------- execution ----------
+
+    async def run(self, short_circuit: bool = True, **inputs) -> Outcome:
+        out = Outcome(values=dict(inputs), passed=True)
+        values = out.values
+        pending = dict(self.stages)
+        unchecked = dict(self.checks)
+        running: Dict[asyncio.Task, Tuple[str, float]] = {}
+        if short_circuit and self._plan is None:
+            self._plan = self._build_plan()
+        plan = list(self._plan) if short_circuit else []
+
+        def _allowed() -> Optional[set]:
+            todo = [c for c in plan if c in unchecked][: 1 + self.prefetch]
+            if not todo:
+                return None     # 没有待判定的 check 了：剩下的 stage 全放行
+            return self._closure(n for c in todo for n in self.checks[c].needs)
+
+        def _launch():
+            allowed = _allowed()
+            for name, s in list(pending.items()):
+                if (allowed is None or name in allowed) and all(d in values for d in s.deps):
+                    del pending[name]
+                    t = asyncio.create_task(s.fn(**{d: values[d] for d in s.deps}))
+                    running[t] = (name, time.perf_counter())
+
+        def _evaluate() -> bool:
+            """判定所有输入已就绪的 check；返回 True 表示应立即结束。"""
+            stop = False
+            for name, c in list(unchecked.items()):
+                if not all(n in values for n in c.needs):
+                    continue
+                del unchecked[name]
+                try:
+                    ok = bool(c.fn(*(values[n] for n in c.needs)))
+                except Exception as e:
+                    out.errors[name] = str(e)
+                    ok = False
+                out.checks[name] = ok
+                if not ok:
+                    out.passed = False
+                    out.rejected_by = out.rejected_by or name
+                    stop = stop or c.hard or short_circuit
+            return stop
+
+        try:
+            while True:
+                if _evaluate():
+                    break
+                _launch()
+                if not running:
+                    break
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for t in done:
+                    name, t0 = running.pop(t)
+                    out.timings_ms[name] = round((time.perf_counter() - t0) * 1000, 1)
+                    try:
+                        values[name] = t.result()
+                    except Exception as e:
+                        out.errors[name] = str(e)
+                        values[name] = None
+        finally:
+            for t, (name, _) in running.items():
+                t.cancel()
+                out.cancelled.append(name)
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+        out.cancelled += list(pending)
+        self._record(out)
+        return out
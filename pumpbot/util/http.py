@@ -1,12 +1,67 @@
 import httpx
+from typing import Dict
+from urllib.parse import urlsplit
 from pumpbot.config import CONFIG
+from pumpbot.util.lifecycle import on_shutdown
+from pumpbot.util.ratelimit import acquire, provider_for_host
 
+try:
+    import h2  # noqa: F401  # httpx 的 HTTP/2 需要 h2（pip install httpx[http2]）
+    _HAS_H2 = True
+except ImportError:
+    _HAS_H2 = False
 
-async def http_get(url: str, headers: dict | None = None, timeout: int = CONFIG["HTTP_TIMEOUT"]):
-    async with httpx.AsyncClient(timeout=timeout, headers=headers) as s:
-        return await s.get(url)
 
+# 每个 provider（按 scheme://host 区分）一个长连接 client，复用 TCP+TLS
+_clients: Dict[str, httpx.AsyncClient] = {}
 
-async def http_post(url: str, data: dict, headers: dict | None = None, timeout: int = CONFIG["HTTP_TIMEOUT"]):
-    async with httpx.AsyncClient(timeout=timeout, headers=headers) as s:
-        return await s.post(url, data=data)
\ No newline at end of file
+
+def _origin(url: str) -> str:
+    u = urlsplit(url)
+    return f"{u.scheme}://{u.netloc}"
+
+
+async def _throttle(request: httpx.Request):
+    # RPC host 的令牌由 chain.rpc.RpcRouter 在计时前按 batch 条数自己取，这里跳过
+    provider = provider_for_host(request.url.host)
+    if provider and provider != "rpc":
+        await acquire(provider)
+
+
+def get_http_client(url: str) -> httpx.AsyncClient:
+    """返回 url 所在 host 的共享 client（keep-alive，支持时走 HTTP/2）。"""
+    key = _origin(url)
+    c = _clients.get(key)
+    if c is None or c.is_closed:
+        host = urlsplit(url).hostname or ""
+        max_conn = CONFIG["HTTP_HOST_LIMITS"].get(host, CONFIG["HTTP_MAX_CONNECTIONS"])
+        limits = httpx.Limits(
+            max_connections=max_conn,
+            max_keepalive_connections=min(max_conn, CONFIG["HTTP_MAX_KEEPALIVE"]),
+            keepalive_expiry=CONFIG["HTTP_KEEPALIVE_EXPIRY"],
+        )
+        c = httpx.AsyncClient(
+            timeout=CONFIG["HTTP_TIMEOUT"],
+            limits=limits,
+            http2=CONFIG["HTTP2"] and _HAS_H2,
+            # 每个请求发出前先从该 provider 的令牌桶取令牌
+            event_hooks={"request": [_throttle]},
+        )
+        _clients[key] = c
+    return c
+
+
+@on_shutdown
+async def close_http_clients():
+    clients = list(_clients.values())
+    _clients.clear()
+    for c in clients:
+        await c.aclose()
+
+
+async def http_get(url: str, headers: dict | None = None, timeout: int = CONFIG["HTTP_TIMEOUT"], params: dict | None = None):
+    return await get_http_client(url).get(url, headers=headers, params=params, timeout=timeout)
+
+
+async def http_post(url: str, data: dict | None = None, headers: dict | None = None, timeout: int = CONFIG["HTTP_TIMEOUT"], json=None):
+    return await get_http_client(url).post(url, data=data, json=json, headers=headers, timeout=timeout)
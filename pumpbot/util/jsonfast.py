@@ -0,0 +1,101 @@
+# pumpbot/util/jsonfast.py
+# JSON 解码层：优先 msgspec（可按 schema 直接解成 dataclass，跳过不要的字段，不建中间 dict），
+# 其次 orjson，最后标准库 json。输入 bytes / str 都行，WS 帧和 httpx 的 r.content 直接传进来，不先转 str。
+import json
+import dataclasses
+from functools import lru_cache
+from typing import Any, Type, TypeVar, Union, get_args, get_origin, get_type_hints
+
+try:
+    import msgspec  # pip install msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson  # pip install orjson
+except ImportError:
+    orjson = None
+
+T = TypeVar("T")
+
+# 各后端的解码错误都归一成 ValueError（orjson / json 本身就是 ValueError 的子类）
+DecodeError = ValueError
+
+
+def loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+    """解成内置类型（dict / list / ...）。"""
+    if orjson is not None:
+        return orjson.loads(data)
+    if msgspec is not None:
+        try:
+            return msgspec.json.decode(data)
+        except msgspec.DecodeError as e:
+            raise DecodeError(str(e)) from e
+    return json.loads(data)
+
+
+def dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    if msgspec is not None:
+        return msgspec.json.encode(obj)
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+if msgspec is not None:
+    @lru_cache(maxsize=None)
+    def _decoder(schema):
+        return msgspec.json.Decoder(schema)
+
+
+@lru_cache(maxsize=None)
+def _hints(tp) -> dict:
+    return get_type_hints(tp)
+
+
+def _convert(tp, obj):
+    """没有 msgspec 时的退路：把 loads 出来的 dict 按 dataclass 注解递归装配（宽松，不做类型校验）。"""
+    if obj is None:
+        return None
+    if dataclasses.is_dataclass(tp):
+        if not isinstance(obj, dict):
+            raise DecodeError(f"expected object for {tp.__name__}, got {type(obj).__name__}")
+        hints = _hints(tp)
+        return tp(**{f.name: _convert(hints[f.name], obj[f.name])
+                     for f in dataclasses.fields(tp) if f.name in obj})
+    origin = get_origin(tp)
+    if origin is Union:
+        for arg in get_args(tp):
+            if dataclasses.is_dataclass(arg) and isinstance(obj, dict):
+                return _convert(arg, obj)
+            if get_origin(arg) is list and isinstance(obj, list):
+                return _convert(arg, obj)
+        return obj
+    if origin is list and isinstance(obj, list):
+        (arg,) = get_args(tp) or (Any,)
+        if dataclasses.is_dataclass(arg) or get_origin(arg) is not None:
+            return [_convert(arg, x) for x in obj]
+    return obj
+
+
+def decode(data: Union[bytes, bytearray, memoryview, str], schema: Type[T]) -> T:
+    """
+    按 schema（dataclass，字段名即 JSON key，可嵌套 / Optional / List）解码。
+    JSON 里多出来的字段直接丢掉；缺的字段用 dataclass 默认值。
+    """
+    if msgspec is not None:
+        try:
+            return _decoder(schema).decode(data)
+        except msgspec.DecodeError as e:  # ValidationError 也是 DecodeError
+            raise DecodeError(str(e)) from e
+    return _convert(schema, loads(data))
+
+
+def convert(obj: Any, schema: Type[T]) -> T:
+    """已经 loads 出来的 dict / list 按 schema 装配（比如合并查询拆出来的一段结果）。"""
+    if msgspec is not None:
+        try:
+            return msgspec.convert(obj, schema)
+        except msgspec.ValidationError as e:
+            raise DecodeError(str(e)) from e
+    return _convert(schema, obj)
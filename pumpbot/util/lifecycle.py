@@ -0,0 +1,48 @@
+# pumpbot/util/lifecycle.py
+from typing import Awaitable, Callable, List
+from contextlib import asynccontextmanager
+
+Hook = Callable[[], Awaitable[None]]
+
+# 各子系统在 import 时注册自己的启动/清理钩子（连接池、缓存落盘等）
+_startup_hooks: List[Hook] = []
+_shutdown_hooks: List[Hook] = []
+
+
+def on_startup(fn: Hook) -> Hook:
+    if fn not in _startup_hooks:
+        _startup_hooks.append(fn)
+    return fn
+
+
+def on_shutdown(fn: Hook) -> Hook:
+    if fn not in _shutdown_hooks:
+        _shutdown_hooks.append(fn)
+    return fn
+
+
+async def startup():
+    for fn in list(_startup_hooks):
+        await fn()
+
+
+async def shutdown():
+    """按注册的逆序执行清理；单个钩子失败不影响其它钩子。"""
+    for fn in reversed(list(_shutdown_hooks)):
+        try:
+            await fn()
+        except Exception as e:
+            print(f"[lifecycle] shutdown hook {getattr(fn, '__name__', fn)} failed: {e}")
+
+
+@asynccontextmanager
+async def running():
+    """
+    async with running():
+        await listen_migrated(...)
+    """
+    await startup()
+    try:
+        yield
+    finally:
+        await shutdown()
@@ -0,0 +1,93 @@
+# pumpbot/util/ratelimit.py
+import time
+import asyncio
+from typing import Dict
+from urllib.parse import urlsplit
+from pumpbot.config import CONFIG, RPC_URLS
+
+
+class TokenBucket:
+    """
+    令牌桶：每秒补充 rate 个令牌，最多攒 burst 个。
+    acquire 按 FIFO 排队，令牌不够就睡到刚好够为止（不做固定 sleep）。
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.tokens = float(burst)
+        self._ts = time.monotonic()
+        self._lock = asyncio.Lock()
+        self.acquired = 0
+        self.waited_sec = 0.0
+        self.last_wait_sec = 0.0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self._ts) * self.rate)
+        self._ts = now
+
+    def level(self) -> float:
+        self._refill()
+        return self.tokens
+
+    async def acquire(self, n: float = 1.0) -> float:
+        """拿 n 个令牌，返回等待的秒数。"""
+        t0 = time.monotonic()
+        async with self._lock:
+            self._refill()
+            if self.tokens < n:
+                await asyncio.sleep((n - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= n
+        waited = time.monotonic() - t0
+        self.acquired += 1
+        self.waited_sec += waited
+        self.last_wait_sec = waited
+        return waited
+
+
+_buckets: Dict[str, TokenBucket] = {}
+_RPC_HOSTS = {urlsplit(u).hostname for u in RPC_URLS}
+
+
+def bucket(provider: str) -> TokenBucket | None:
+    """CONFIG["RATE_LIMITS"] 里没配的 provider 不限速，返回 None。"""
+    b = _buckets.get(provider)
+    if b is None:
+        cfg = CONFIG["RATE_LIMITS"].get(provider)
+        if not cfg:
+            return None
+        b = _buckets[provider] = TokenBucket(cfg["rate"], cfg["burst"])
+    return b
+
+
+def provider_for_host(host: str | None) -> str | None:
+    if host in _RPC_HOSTS:
+        return "rpc"
+    return CONFIG["RATE_LIMIT_HOSTS"].get(host or "")
+
+
+async def acquire(provider: str, n: float = 1.0) -> float:
+    b = bucket(provider)
+    return await b.acquire(n) if b else 0.0
+
+
+async def acquire_for_url(url: str, n: float = 1.0) -> float:
+    provider = provider_for_host(urlsplit(url).hostname)
+    return await acquire(provider, n) if provider else 0.0
+
+
+def stats() -> Dict[str, dict]:
+    """各 provider 当前令牌余量、累计等待时间，供打印/监控。"""
+    out = {}
+    for name, b in _buckets.items():
+        out[name] = {
+            "rate": b.rate,
+            "burst": b.burst,
+            "tokens": round(b.level(), 2),
+            "acquired": b.acquired,
+            "waited_sec": round(b.waited_sec, 3),
+            "last_wait_ms": round(b.last_wait_sec * 1000, 1),
+        }
+    return out
@@ -0,0 +1,152 @@
+# pumpbot/util/scheduler.py
+import time
+import heapq
+import asyncio
+import itertools
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set
+
+from pumpbot.config import CONFIG
+from pumpbot.util.lifecycle import on_shutdown
+
+
+@dataclass(order=True)
+class Job:
+    priority: float                     # 越小越先跑
+    seq: int                            # 同优先级按提交顺序
+    fn: Callable[..., Awaitable[Any]] = field(compare=False)
+    args: tuple = field(default=(), compare=False)
+    kwargs: dict = field(default_factory=dict, compare=False)
+    name: str = field(default="-", compare=False)
+    deadline: Optional[float] = field(default=None, compare=False)   # wall-clock 秒；过了就不跑
+    enq_at: float = field(default_factory=time.monotonic, compare=False)
+
+
+class Scheduler:
+    """
+    有界的 worker 池：
+      - submit() 不阻塞，不会无限堆协程；队列满了先清掉已过 deadline 的（计 expired），
+        还满就挤掉队里优先级最低的（计 evicted），新任务也不比它高才拒绝（计 rejected）
+      - 固定 workers 个协程按 priority 取任务
+      - 取到时已过 deadline 的任务直接丢弃（计 expired）
+      - drain() 停止接新任务、等队列跑完（超时则取消），供 shutdown 用
+    """
+
+    def __init__(self, name: str, workers: int, maxsize: int, wait_window: int = 500):
+        self.name = name
+        self.workers = max(1, workers)
+        self.queue: asyncio.PriorityQueue = asyncio.PriorityQueue(maxsize=maxsize)
+        self._seq = itertools.count()
+        self._tasks: List[asyncio.Task] = []
+        self._closed = False
+        self._running = 0
+        self._waits: Deque[float] = deque(maxlen=wait_window)
+        self.counters: Dict[str, int] = {
+            "submitted": 0, "rejected": 0, "evicted": 0, "expired": 0, "completed": 0, "failed": 0, "max_depth": 0,
+        }
+        _schedulers.add(self)
+
+    def start(self):
+        if self._tasks:
+            return
+        self._closed = False
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    def submit(self, fn: Callable[..., Awaitable[Any]], *args, priority: float = 0,
+               deadline: Optional[float] = None, name: str = "-", **kwargs) -> bool:
+        """排队一个 fn(*args, **kwargs)；返回 False 表示被拒（已关闭或队列满）。"""
+        if self._closed:
+            self.counters["rejected"] += 1
+            return False
+        self.start()
+        job = Job(priority, next(self._seq), fn, args, kwargs, name, deadline)
+        if self.queue.full() and not self._make_room(job):
+            self.counters["rejected"] += 1
+            print(f"[sched] {self.name}: queue full ({self.queue.maxsize}), rejected {name}")
+            return False
+        self.queue.put_nowait(job)
+        self.counters["submitted"] += 1
+        self.counters["max_depth"] = max(self.counters["max_depth"], self.queue.qsize())
+        return True
+
+    def _make_room(self, job: Job) -> bool:
+        """队列满时腾位置：先丢已过 deadline 的，再挤掉比 job 优先级低的最后一个；腾不出返回 False。"""
+        heap: List[Job] = self.queue._queue        # PriorityQueue 底层的堆
+        now = time.time()
+        shed = [j for j in heap if j.deadline is not None and now > j.deadline]
+        if shed:
+            self.counters["expired"] += len(shed)
+            print(f"[sched] {self.name}: queue full, shed {len(shed)} past deadline")
+        else:
+            victim = max(heap)
+            if not job < victim:
+                return False
+            shed = [victim]
+            self.counters["evicted"] += 1
+            print(f"[sched] {self.name}: queue full, evicted {victim.name} for {job.name}")
+        gone = set(map(id, shed))
+        heap[:] = [j for j in heap if id(j) not in gone]
+        heapq.heapify(heap)
+        for _ in shed:
+            self.queue.task_done()               # 不会再被 get()，join() 的计数要对上
+        return True
+
+    async def _worker(self):
+        while True:
+            job: Job = await self.queue.get()
+            try:
+                self._waits.append(time.monotonic() - job.enq_at)
+                if job.deadline is not None and time.time() > job.deadline:
+                    self.counters["expired"] += 1
+                    print(f"[sched] {self.name}: {job.name} past deadline, shed")
+                    continue
+                self._running += 1
+                try:
+                    await job.fn(*job.args, **job.kwargs)
+                    self.counters["completed"] += 1
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self.counters["failed"] += 1
+                    print(f"[sched] {self.name}: {job.name} failed: {e}")
+                finally:
+                    self._running -= 1
+            finally:
+                self.queue.task_done()
+
+    async def drain(self, timeout: float | None = None):
+        """不再接新任务；等已排队/在跑的任务完成，超过 timeout 秒则取消剩下的。"""
+        self._closed = True
+        if self._tasks:
+            try:
+                await asyncio.wait_for(self.queue.join(), timeout)
+            except asyncio.TimeoutError:
+                print(f"[sched] {self.name}: drain timed out, {self.queue.qsize()} queued / {self._running} running cancelled")
+        tasks, self._tasks = self._tasks, []
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        waits = sorted(self._waits)
+        pct = lambda q: round(waits[min(len(waits) - 1, int(q * len(waits)))] * 1000, 1) if waits else 0.0
+        return {
+            **self.counters,
+            "depth": self.queue.qsize(),
+            "running": self._running,
+            "wait_p50_ms": pct(0.5),
+            "wait_p90_ms": pct(0.9),
+        }
+
+
+_schedulers: Set[Scheduler] = set()
+
+
+def stats() -> Dict[str, Dict[str, Any]]:
+    return {s.name: s.stats() for s in _schedulers}
+
+
+@on_shutdown
+async def drain_schedulers():
+    await asyncio.gather(*(s.drain(CONFIG["SCHED_DRAIN_SEC"]) for s in list(_schedulers)))
@@ -0,0 +1,46 @@
+# pumpbot/util/singleflight.py
+import asyncio
+import functools
+from typing import Any, Callable, Dict, Hashable
+
+# (provider, func, key) -> 正在进行中的请求；完成后立即移除（这里不做缓存）
+_inflight: Dict[Hashable, asyncio.Task] = {}
+
+
+async def do(key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+    """同一个 key 同时只跑一次 fn，并发的相同调用共享同一个结果（或异常）。"""
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(fn(*args, **kwargs))
+        _inflight[key] = task
+        task.add_done_callback(lambda _t: _inflight.pop(key, None))
+    # shield：某个等待方被取消不影响其它共享这个请求的调用方
+    return await asyncio.shield(task)
+
+
+def singleflight(provider: str, key: Callable[..., Hashable] | None = None):
+    """
+    @singleflight("dexscreener")
+    async def get_token_pair_from_dexscreener(mint): ...
+
+    key 默认取全部参数；参数里有 client 之类不可比较的对象时自己指定，
+    如 key=lambda client, mint: mint
+    """
+    def deco(fn):
+        name = f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            k = key(*args, **kwargs) if key else (args, tuple(sorted(kwargs.items())))
+            try:
+                hash(k)
+            except TypeError:
+                return await fn(*args, **kwargs)
+            return await do((provider, name, k), fn, *args, **kwargs)
+
+        return wrapper
+    return deco
+
+
+def inflight() -> int:
+    return len(_inflight)
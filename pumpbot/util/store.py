@@ -0,0 +1,100 @@
+# pumpbot/util/store.py
+import json
+import sqlite3
+import asyncio
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from pumpbot.config import CONFIG
+from pumpbot.util.lifecycle import on_shutdown
+
+_MISSING = object()
+
+
+class FactStore:
+    """
+    不会再变的 token 事实（mint birth、pair 地址/创建时间…）的本地持久化，SQLite WAL。
+    - 第一次用到时才打开数据库
+    - 读：先看待写队列，再去线程池里查 SQLite，不阻塞事件循环
+    - 写：只进内存队列，后台每 flush_sec 秒批量落盘；退出时 flush
+    """
+
+    def __init__(self, path: str, flush_sec: float = 1.0):
+        self.path = Path(path)
+        self.flush_sec = flush_sec
+        self._conn: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._pending: Dict[Tuple[str, str], Any] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def _open(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS facts ("
+                " kind TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, updated_at INTEGER NOT NULL,"
+                " PRIMARY KEY (kind, key))"
+            )
+            self._conn = conn
+        return self._conn
+
+    def _get_sync(self, kind: str, key: str) -> Any:
+        with self._db_lock:
+            row = self._open().execute(
+                "SELECT value FROM facts WHERE kind = ? AND key = ?", (kind, key)
+            ).fetchone()
+        return _MISSING if row is None else json.loads(row[0])
+
+    def _write_sync(self, items: Dict[Tuple[str, str], Any]):
+        now = int(time.time())
+        rows = [(kind, key, json.dumps(v), now) for (kind, key), v in items.items()]
+        with self._db_lock:
+            conn = self._open()
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO facts VALUES (?, ?, ?, ?)", rows)
+
+    async def get(self, kind: str, key: str, default: Any = None) -> Any:
+        v = self._pending.get((kind, key), _MISSING)
+        if v is _MISSING:
+            v = await asyncio.to_thread(self._get_sync, kind, key)
+        return default if v is _MISSING else v
+
+    def put(self, kind: str, key: str, value: Any):
+        """非阻塞：进队列，稍后由后台任务批量写入。"""
+        self._pending[(kind, key)] = value
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_sec)
+        await self.flush()
+
+    async def flush(self):
+        if not self._pending:
+            return
+        items, self._pending = self._pending, {}
+        try:
+            await asyncio.to_thread(self._write_sync, items)
+        except Exception as e:
+            print(f"[store] flush failed ({len(items)} facts): {e}")
+
+    async def close(self):
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+        await self.flush()
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+store = FactStore(CONFIG["STORE_PATH"], CONFIG["STORE_FLUSH_SEC"])
+
+
+@on_shutdown
+async def close_store():
+    await store.close()
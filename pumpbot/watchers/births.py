@@ -0,0 +1,57 @@
+# pumpbot/watchers/births.py
+# Purpose: feed the mint birth-time index (metrics.ttc) ahead of migration:
+#  - PumpPortal subscribeNewToken (Pump.fun creations)
+#  - Meteora DBC InitializeVirtualPoolWithSplToken logs (via Solana logsSubscribe)
+# compute_ttc_ms then resolves birth in O(1); the signature walk stays as fallback
+# for mints created before the process started.
+
+from typing import Optional
+
+from pumpbot.config import CONFIG
+from pumpbot.chain.tx_waiter import on_transaction
+from pumpbot.metrics.ttc import record_birth
+from pumpbot.ingest.bus import bus
+from pumpbot.ingest.events import LogsEvent, NewTokenEvent
+from pumpbot.ingest.sources import pumpportal, solana_logs
+
+WSOL_MINT = "So11111111111111111111111111111111111111112"
+
+
+def _dbc_mint_from_tx(tx: dict) -> Optional[str]:
+    for bal in ((tx.get("meta") or {}).get("postTokenBalances") or []):
+        mint = bal.get("mint")
+        if mint and mint != WSOL_MINT:
+            return mint
+    return None
+
+
+def _record_dbc_birth(tx: Optional[dict]):
+    if tx:
+        mint = _dbc_mint_from_tx(tx)
+        if mint and tx.get("blockTime"):
+            record_birth(mint, int(tx["blockTime"]) * 1000)
+
+
+async def run_birth_index():
+    """
+    订阅 PumpPortal 新币事件（事件本身无区块时间，用接收时间）和 DBC 建池日志
+    （拉交易拿 mint 与 blockTime），写进 birth 索引。
+    """
+    dbc = CONFIG["DBC_PROGRAM_ID"]
+    sub = bus.subscribe(
+        NewTokenEvent, LogsEvent,
+        where=lambda ev: not isinstance(ev, LogsEvent) or ev.program == dbc,
+    )
+    await pumpportal.want("subscribeNewToken")
+    await solana_logs.watch(dbc)
+    bus.start(pumpportal.name, solana_logs.name)
+
+    try:
+        async for ev in sub:
+            if isinstance(ev, NewTokenEvent):
+                record_birth(ev.mint, ev.recv_ms)
+            elif not ev.err and ev.has("Instruction: InitializeVirtualPoolWithSplToken"):
+                # 交易刚确认时 getTransaction 可能还查不到，由 tx_waiter 的时间轮批量重试后回调
+                on_transaction(ev.signature, _record_dbc_birth)
+    finally:
+        sub.close()
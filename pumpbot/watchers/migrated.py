@@ -5,17 +5,14 @@
 #
 # Output: notify_serverchan with ONLY name + mint (name may be "-")
 
-import json
 import time
 import asyncio
-from typing import Optional, AsyncIterator
+from typing import Optional
 
-import websockets
-
-from pumpbot.config import CONFIG, RPC_URL
 from pumpbot.util.notify import notify_serverchan
-
-PUMP_WS = CONFIG["PUMP_WS"]  # "wss://pumpportal.fun/api/data"
+from pumpbot.ingest.bus import bus
+from pumpbot.ingest.events import Event, LogsEvent, MigrationEvent
+from pumpbot.ingest.sources import pumpportal, solana_logs
 
 # ====== Configure your AMM programs (FILL THESE) ======
 # Put the exact program IDs you want to watch. Examples (replace with your up-to-date IDs):
@@ -51,66 +48,8 @@ def _dedupe_key(ev: dict) -> str:
     mint = ev.get("mint") or ev.get("token") or ev.get("tokenAddress") or ev.get("address") or "-"
     return f"mint:{mint}"
 
-# ====== Source A: PumpPortal (Pump.fun + BONK) ======
-
-async def source_pumpportal() -> AsyncIterator[dict]:
-    """Yield {'mint': str, 'name': str, 'signature': Optional[str]} for migrate events."""
-    async with websockets.connect(PUMP_WS) as ws:
-        await ws.send(json.dumps({"method": "subscribeMigration"}))
-        # print("[pumpportal] subscribed")
-
-        while True:
-            raw = await ws.recv()
-            try:
-                obj = json.loads(raw)
-            except Exception:
-                continue
-
-            payload = obj.get("data") if isinstance(obj.get("data"), dict) else obj
-            etype = (payload.get("type") or payload.get("event") or "").lower()
-            if "migrat" not in etype and '"migrate"' not in raw.lower():
-                # Not a migration event
-                continue
-
-            mint = (
-                payload.get("mint")
-                or payload.get("token")
-                or payload.get("tokenAddress")
-                or payload.get("address")
-            )
-            if not mint:
-                continue
-
-            name = _norm_name(payload.get("name"))
-            sig = payload.get("signature") or payload.get("tx") or payload.get("txHash")
-            yield {"mint": mint, "name": name, "signature": sig, "src": "pumpportal"}
-
 # ====== Source B: On-chain AMM logs (broad coverage) ======
 
-async def _rpc_ws(method: str, params) -> AsyncIterator[dict]:
-    """Simple JSON-RPC WS client that yields notifications."""
-    # RPC_URL from your .env should support websockets (wss://...) for logsSubscribe
-    # If your RPC URL is http(s), swap in the corresponding wss endpoint from your provider.
-    if RPC_URL.startswith("http"):
-        ws_url = RPC_URL.replace("https://", "wss://").replace("http://", "ws://")
-    else:
-        ws_url = RPC_URL
-
-    async with websockets.connect(ws_url) as ws:
-        await ws.send(json.dumps({"jsonrpc": "2.0", "id": 1, "method": method, "params": params}))
-        # ack
-        _ = await ws.recv()
-
-        while True:
-            raw = await ws.recv()
-            try:
-                msg = json.loads(raw)
-            except Exception:
-                continue
-            # notifications carry "method":"logsNotification" etc.
-            if isinstance(msg, dict) and "params" in msg:
-                yield msg["params"]
-
 def _maybe_extract_pool_event(logs: list[str]) -> Optional[dict]:
     """
     Very light heuristic: detect pool init or first LP add from log lines.
@@ -133,59 +72,39 @@ def _maybe_extract_pool_event(logs: list[str]) -> Optional[dict]:
         return {"hint": "pool"}
     return None
 
-async def source_amm_logs() -> AsyncIterator[dict]:
+def _amm_event(ev: LogsEvent) -> Optional[dict]:
     """
-    Subscribe to logs for known AMM program IDs and infer 'migration'
-    when we see pool init / first liquidity style logs.
+    Infer 'migration' from AMM program logs when we see pool init / first liquidity style logs.
     """
-    if not AMM_PROGRAM_IDS:
-        return  # nothing to watch
-
-    # One subscription per program (simplest & lean)
-    tasks = []
-    queue: asyncio.Queue[dict] = asyncio.Queue()
-
-    async def _watch_program(pid: str):
-        # logsSubscribe with mentions=pid (program logs)
-        params = [{"mentions": [pid]}, {"commitment": "confirmed"}]
-        async for notif in _rpc_ws("logsSubscribe", params):
-            value = notif.get("result", {}).get("value", {})
-            logs = value.get("logs") or []
-            sig = value.get("signature")
-            # naive detect
-            hit = _maybe_extract_pool_event(logs)
-            if not hit:
-                continue
-            # We usually need to resolve the mint(s) from accounts in the tx;
-            # keep it lean: we rely on upstream indexers to post a human-friendly line.
-            # If your RPC supports enhanced logs with accounts, decode here.
-            #
-            # Placeholder: try to spot a 32-44 char base58-ish token in logs.
-            # If we can't, emit without mint; your downstream can enrich.
-            mint = None
-            for line in logs:
-                # very rough pattern; replace with proper parser if you want
-                parts = line.split()
-                for p in parts:
-                    if 32 <= len(p) <= 44 and p.isalnum() and p[0].isupper():
-                        mint = p
-                        break
-                if mint:
-                    break
-
-            yield_ev = {"mint": mint or "-", "name": "-", "signature": sig, "src": "amm"}
-            await queue.put(yield_ev)
-
-    for pid in AMM_PROGRAM_IDS:
-        tasks.append(asyncio.create_task(_watch_program(pid)))
-
-    try:
-        while True:
-            ev = await queue.get()
-            yield ev
-    finally:
-        for t in tasks:
-            t.cancel()
+    # naive detect
+    hit = _maybe_extract_pool_event(ev.logs)
+    if not hit:
+        return None
+    # We usually need to resolve the mint(s) from accounts in the tx;
+    # keep it lean: we rely on upstream indexers to post a human-friendly line.
+    # If your RPC supports enhanced logs with accounts, decode here.
+    #
+    # Placeholder: try to spot a 32-44 char base58-ish token in logs.
+    # If we can't, emit without mint; your downstream can enrich.
+    mint = None
+    for line in ev.logs:
+        # very rough pattern; replace with proper parser if you want
+        parts = line.split()
+        for p in parts:
+            if 32 <= len(p) <= 44 and p.isalnum() and p[0].isupper():
+                mint = p
+                break
+        if mint:
+            break
+
+    return {"mint": mint or "-", "name": "-", "signature": ev.signature, "src": "amm"}
+
+def _to_item(ev: Event) -> Optional[dict]:
+    if isinstance(ev, MigrationEvent):
+        return {"mint": ev.mint, "name": ev.name, "signature": ev.signature, "src": ev.src}
+    if isinstance(ev, LogsEvent):
+        return _amm_event(ev)
+    return None
 
 # ====== Coordinator ======
 
@@ -199,37 +118,31 @@ async def listen_migrated(
     Only send **name + mint**.
     """
     timeout_at = _now() + minutes * 60 if minutes and minutes > 0 else None
-    sent = 0
-    seen: set[str] = set()
-
-    async def _pump():
-        async for ev in source_pumpportal():
-            yield ev
 
-    async def _amm():
-        async for ev in source_amm_logs():
-            yield ev
-
-    async def _merge():
-        tasks = []
-        queue: asyncio.Queue[dict] = asyncio.Queue()
-
-        async def _push(src_iter):
-            async for item in src_iter:
-                await queue.put(item)
+    # Source A: PumpPortal (Pump.fun + BONK); Source B: AMM program logs.
+    # Both come off the shared ingestion bus (one socket per upstream).
+    sub = bus.subscribe(
+        MigrationEvent, LogsEvent,
+        where=lambda e: not isinstance(e, LogsEvent) or e.program in AMM_PROGRAM_IDS,
+    )
+    await pumpportal.want("subscribeMigration")
+    for pid in AMM_PROGRAM_IDS:
+        await solana_logs.watch(pid)
+    bus.start(pumpportal.name, *([solana_logs.name] if AMM_PROGRAM_IDS else []))
+    try:
+        await _consume(sub, timeout_at, max_items, push)
+    finally:
+        sub.close()
 
-        tasks.append(asyncio.create_task(_push(_pump())))
-        tasks.append(asyncio.create_task(_push(_amm())))
 
-        try:
-            while True:
-                item = await queue.get()
-                yield item
-        finally:
-            for t in tasks:
-                t.cancel()
+async def _consume(sub, timeout_at: Optional[float], max_items: Optional[int], push: bool) -> None:
+    sent = 0
+    seen: set[str] = set()
 
-    async for ev in _merge():
+    async for raw_ev in sub:
+        ev = _to_item(raw_ev)
+        if ev is None:
+            continue
         if timeout_at and _now() >= timeout_at:
             print("[migrated] time limit reached, exit.")
             return
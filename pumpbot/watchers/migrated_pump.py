@@ -1,5 +1,5 @@
 # pumpbot/watchers/migrated.py
-import json, time, asyncio, websockets, httpx
+import time, asyncio
 from datetime import datetime
 from typing import Optional
 from pathlib import Path
@@ -7,18 +7,22 @@ import csv
 
 
 from pumpbot.config import CONFIG, PUMPPORTAL_KEY, BITQUERY_API_KEY
-from pumpbot.metrics.bundler import calc_bundlers_ratio_eap
-from pumpbot.metrics.gas import calc_total_fees_gmgn_style
+from pumpbot.bitquery.compose import Metric, Query, run_one
+from pumpbot.bitquery.eap import BitqueryError
+from pumpbot.metrics.bundler import BUNDLER_HEAD, calc_bundlers_ratio_eap
+from pumpbot.metrics.gas import DEFAULT_BUNDLERS, FEES, calc_total_fees_gmgn_style
 from pumpbot.metrics.holders import compute_top_ratio
 from pumpbot.metrics.mcap import fast_mcap_usd
 from pumpbot.metrics.ttc import compute_ttc_ms, humanize_duration
 from pumpbot.dex.dexscreener import get_token_pair_from_dexscreener
 from pumpbot.util.notify import notify_serverchan
-from pumpbot.chain.rpc import get_client
-
-_SEM = asyncio.Semaphore(4)
-EAP = "https://streaming.bitquery.io/eap"
-
+from pumpbot.util.scheduler import Scheduler
+from pumpbot.chain.rpc import acquire_client
+from pumpbot.watchers.births import run_birth_index
+from pumpbot.watchers.trades import tracker
+from pumpbot.ingest.bus import bus
+from pumpbot.ingest.events import MigrationEvent
+from pumpbot.ingest.sources import pumpportal
 
 def _to_utc_str(sec: int) -> str:
     return time.strftime("%Y-%m-%d %H:%M:%S UTC", time.gmtime(sec))
@@ -90,6 +94,7 @@ async def _compute_and_report_metrics(
     pair_addr: str | None,
     migrated_time_sec: int,
     push: bool = True,
+    bq: Optional[dict] = None,
 ):
     """
     Compute 5 metrics and send + persist:
@@ -98,6 +103,7 @@ async def _compute_and_report_metrics(
       - Market cap (fast)
       - Top holders ratio (Top-10)
       - TTC (creation -> migrated)
+    bq: results of _bitquery_prefetch; whatever is missing is fetched on its own.
     """
     # 1) TTC (needs ms)
     ttc_ms, birth_ms = await compute_ttc_ms(mint, migrated_time_sec * 1000)
@@ -105,15 +111,16 @@ async def _compute_and_report_metrics(
     ttc_h = humanize_duration(ttc_ms)
 
     # 2) parallelize the rest
-    client = await get_client()
-    bundlers_coro = calc_bundlers_ratio_eap(mint)  # EAP inside, no args
-    gas_coro = calc_total_fees_gmgn_style(None, mint_address=mint)
-    mcap_coro = fast_mcap_usd(client, mint)
-    top10_coro = compute_top_ratio(client, mint, top_n=10)
-
-    bundlers, gas, (mcap_usd, price_usd), top10_ratio = await asyncio.gather(
-        bundlers_coro, gas_coro, mcap_coro, top10_coro
-    )
+    async with acquire_client() as client:
+        bq = bq or {}
+        bundlers_coro = calc_bundlers_ratio_eap(mint, head=bq.get("bundler_head"))  # pages on from the prefetched head
+        gas_coro = asyncio.sleep(0, result=bq["fees"]) if "fees" in bq else calc_total_fees_gmgn_style(None, mint_address=mint)
+        mcap_coro = fast_mcap_usd(client, mint)
+        top10_coro = compute_top_ratio(client, mint, top_n=10)
+
+        bundlers, gas, (mcap_usd, price_usd), top10_ratio = await asyncio.gather(
+            bundlers_coro, gas_coro, mcap_coro, top10_coro
+        )
 
     # unpack (defensive defaults)
     bundlers_ratio = float(bundlers.get("bundlers_ratio", 0.0))
@@ -176,36 +183,53 @@ async def _compute_and_report_metrics(
 
 # ---------- Fast birth-time resolvers (Bitquery → Dex → RPC) ----------
 
+def _parse_creation(sol: dict) -> Optional[int]:
+    rows = sol.get("first") or []
+    ts = (rows[0].get("Block") or {}).get("Time") if rows else None
+    return _iso_to_timestamp(ts) if ts else None
+
+
+CREATION = Metric("creation", """
+    __first: Transactions(
+      where:{Transaction:{Accounts:{includes:{Address:{is:$addr}}}}}
+      orderBy:{ascendingByField:"Block_Time"}
+      limit:{count:1}
+    ){ Block{ Time } }
+""", {"addr": "String!"}, _parse_creation)
+
+
 async def _token_creation(address: str) -> Optional[int]:
     """Earliest on-chain time for address via Bitquery EAP (fast)."""
     if not BITQUERY_API_KEY:
         return None
-    q = """
-    query($addr:String!){
-      Solana{
-        Transactions(
-          where:{Transaction:{Accounts:{includes:{Address:{is:$addr}}}}}
-          orderBy:{ascendingByField:"Block_Time"}
-          limit:{count:1}
-        ){ Block{ Time } }
-      }
-    }"""
-    headers = {"Content-Type": "application/json",
-               "Authorization": f"Bearer {BITQUERY_API_KEY}"}
     try:
-        async with httpx.AsyncClient(timeout=15) as s:
-            r = await s.post(EAP, json={"query": q, "variables": {"addr": address}}, headers=headers)
-            if r.status_code != 200:
-                return None
-            rows = (((r.json().get("data") or {}).get("Solana") or {}).get("Transactions")) or []
-            if not rows:
-                return None
-            ts = (rows[0].get("Block") or {}).get("Time")
-            return _iso_to_timestamp(ts) if ts else None
+        return await run_one(CREATION, timeout=15, addr=address)
     except Exception:
         return None
 
 
+async def _bitquery_prefetch(mint: str) -> dict:
+    """
+    metrics 报告用的 fees / 第一页 bundler 行合成一个 Bitquery 请求（原来是各发各的）。
+    creation 不放进来：MIGRATED 推送只等那个单行的快查询。失败的项不放进结果，用到时各自回退到单独请求。
+    """
+    if not BITQUERY_API_KEY:
+        return {}
+    q = Query()
+    keys = {
+        "fees": q.add(FEES, addr=mint, tips=list(DEFAULT_BUNDLERS)),
+        "bundler_head": q.add(BUNDLER_HEAD, token=mint, after=0, limit=CONFIG["BITQUERY_PAGE_SIZE"]),
+    }
+    res = await q.run()
+    out = {}
+    for name, key in keys.items():
+        if isinstance(res[key], BitqueryError):
+            print(f"[bitquery] {name} for {mint}: {res[key]}")
+        else:
+            out[name] = res[key]
+    return out
+
+
 async def _get_creation_and_t2migrated(mint: str, migrated_time: int) -> tuple[Optional[int], Optional[int]]:
 
     creation_time = await _token_creation(mint)
@@ -216,70 +240,102 @@ async def _get_creation_and_t2migrated(mint: str, migrated_time: int) -> tuple[O
 
 # ----------------------------- Listener -----------------------------
 
-async def listen_migrated(minutes: int = 10, max_items: int = 20, push: bool = True):
-    ws_url = CONFIG["PUMP_WS"]
+# 每个迁移 mint 的分析都走这个有界 worker 池：新迁移优先，过了 ANALYSIS_DEADLINE_SEC 的直接丢弃
+_analysis = Scheduler("migrated", CONFIG["SCHED_WORKERS"], CONFIG["SCHED_QUEUE"])
 
+
+async def _push_migrated(mint: str, migrated_time: int, pair_addr: Optional[str], push: bool):
+    t2migrated, creation_time = await _get_creation_and_t2migrated(mint, migrated_time)
+    # Optional push for the raw migration event
+    if push:
+        msg = (
+            f"**MIGRATED**\n\n"
+            f"**Mint:** `{mint}`\n\n"
+            + (f"**Pair:** `{pair_addr}`\n\n" if pair_addr else "")
+            + f"**MigratedAt:** {_to_utc_str(migrated_time)}\n\n"
+            + (f"**CreationTime:** {_to_utc_str(creation_time)}\n\n" if creation_time is not None else "No creation time")
+            + f"**TTC(created→migrated):** "
+            + (f"{t2migrated} sec" if t2migrated is not None else "No calculation")
+            + "\n"
+        )
+        await notify_serverchan(f"[MIGRATED] {mint[:6]}...{mint[-4:]}", msg)
+
+
+async def _handle_migration(mint: str, migrated_time: int, push: bool):
+    # Pair (for reporting & bundlers)
+    pair_info = await get_token_pair_from_dexscreener(mint)
+    pair_addr = (pair_info or {}).get("pairAddress")
+
+    # metrics 的合并查询在后台先跑着，MIGRATED 推送只等 creation 单行查询
+    prefetch = asyncio.create_task(_bitquery_prefetch(mint))
+    try:
+        await _push_migrated(mint, migrated_time, pair_addr, push)
+    except BaseException:
+        prefetch.cancel()
+        raise
+
+    try:
+        bq = await prefetch
+    except Exception as e:
+        print(f"[bitquery] prefetch for {mint} failed: {e}")
+        bq = {}
+
+    await _compute_and_report_metrics(
+        mint,
+        pair_addr=pair_addr,
+        migrated_time_sec=migrated_time,
+        push=push,
+        bq=bq,
+    )
+
+
+async def listen_migrated(minutes: int = 10, max_items: int = 20, push: bool = True):
     got, seen = 0, set()
     timeout_at = time.time() + minutes * 60 if minutes else None
     print(f"[migrated] listening... minutes={minutes} max={max_items}")
 
-    async with websockets.connect(ws_url, ping_interval=20) as ws:
-        await ws.send(json.dumps({"method": "subscribeMigration"}))
+    # 迁移事件来自共享的 ingestion bus（与 birth 索引共用同一条 PumpPortal 连接）
+    sub = bus.subscribe(MigrationEvent)
+    await pumpportal.want("subscribeMigration")
+    bus.start(pumpportal.name)
+
+    # 创建流提前喂 birth 索引，迁移时 TTC 直接命中
+    births = asyncio.create_task(run_birth_index()) if CONFIG["BIRTH_INDEX_ENABLED"] else None
+    try:
         while True:
-            raw = await asyncio.wait_for(ws.recv(), timeout=100)
             if timeout_at and time.time() > timeout_at:
                 break
             if max_items and got >= max_items:
                 break
             try:
-                raw = await asyncio.wait_for(ws.recv(), timeout=100)
+                ev = await asyncio.wait_for(sub.get(), timeout=100)
             except asyncio.TimeoutError:
                 continue
 
-            data = json.loads(raw) if raw else {}
-            print(data)
-            mint = data.get("mint") or data.get("token") or data.get("address")
-            print(mint)
+            print(ev)
+            mint = ev.mint
             if not mint or mint in seen:
                 continue
             seen.add(mint)
             got += 1
 
-            print("I am here 2")
-            # Pair (for reporting & bundlers)
-            pair_info = await get_token_pair_from_dexscreener(mint)
-            pair_addr = (pair_info or {}).get("pairAddress")
-
-            print("I am here 3")
-            ts_raw = data.get("timestamp") or data.get("ts") or data.get("time") or data.get("blockTime") or int(time.time())
+            ts_raw = ev.ts_raw
             if ts_raw is None:
                 print(f"Warning: No timestamp in data for mint {mint}, using current time")
                 ts_raw = int(time.time())
-
             migrated_time = _event_ts(ts_raw) or int(time.time())
 
-            t2migrated, creation_time = await _get_creation_and_t2migrated(mint, migrated_time)
-
-            async def _run_all():
-                async with _SEM:
-                    await _compute_and_report_metrics(
-                        mint,
-                        pair_addr=pair_addr,
-                        migrated_time_sec=migrated_time,
-                        push=push,
-                    )
-
-            asyncio.create_task(_run_all())
-            # Optional push for the raw migration event
-            if push: 
-                msg = (
-                    f"**MIGRATED**\n\n"
-                    f"**Mint:** `{mint}`\n\n"
-                    + (f"**Pair:** `{pair_addr}`\n\n" if pair_addr else "")
-                    + f"**MigratedAt:** {_to_utc_str(migrated_time)}\n\n"
-                    + (f"**CreationTime:** {_to_utc_str(creation_time)}\n\n" if creation_time is not None else "No creation time")
-                    + f"**TTC(created→migrated):** "
-                    + (f"{t2migrated} sec" if t2migrated is not None else "No calculation")
-                    + "\n"
-                )
-                await notify_serverchan(f"[MIGRATED] {mint[:6]}...{mint[-4:]}", msg)
\ No newline at end of file
+            # 迁移后的成交从现在起增量累积，之后随时 tracker.get(mint).snapshot() 读取
+            if CONFIG["TRADE_TRACKER_ENABLED"]:
+                await tracker.track(mint, since_ms=migrated_time * 1000)
+
+            _analysis.submit(
+                _handle_migration, mint, migrated_time, push,
+                priority=-migrated_time,
+                deadline=migrated_time + CONFIG["ANALYSIS_DEADLINE_SEC"],
+                name=mint,
+            )
+    finally:
+        sub.close()
+        if births:
+            births.cancel()
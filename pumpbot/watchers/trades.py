@@ -0,0 +1,106 @@
+# pumpbot/watchers/trades.py
+# 迁移后的逐笔成交跟踪：PumpPortal subscribeTokenTrade（按 mint 订阅）→ bus → 每个 mint 一个 MintState。
+# 成交帧没有 slot / fee 时，挂到 tx_waiter 上补查（批量 getTransaction），查到再补进状态。
+import time
+import asyncio
+from collections import OrderedDict
+from typing import Optional
+
+from pumpbot.config import CONFIG
+from pumpbot.chain.tx_waiter import on_transaction
+from pumpbot.ingest.bus import bus
+from pumpbot.ingest.events import TradeEvent
+from pumpbot.ingest.sources import pumpportal
+from pumpbot.metrics.live import MintState
+from pumpbot.util.lifecycle import on_shutdown
+
+_METHOD = "subscribeTokenTrade"
+
+
+class TradeTracker:
+    """
+    st = await tracker.track(mint, since_ms=migrated_ms)
+    ...
+    tracker.get(mint).snapshot()   # 任意时刻 O(1)
+    最多跟踪 max_mints 个（LRU 淘汰），跟踪超过 ttl_sec 的自动退订。
+    """
+
+    def __init__(self, max_mints: int, ttl_sec: float, resolve_tx: bool):
+        self.max_mints = max_mints
+        self.ttl_ms = ttl_sec * 1000
+        self.resolve_tx = resolve_tx
+        self.states: "OrderedDict[str, MintState]" = OrderedDict()
+        self._task: Optional[asyncio.Task] = None
+
+    def get(self, mint: str) -> Optional[MintState]:
+        return self.states.get(mint)
+
+    async def track(self, mint: str, since_ms: Optional[int] = None) -> MintState:
+        st = self.states.get(mint)
+        if st is not None:
+            self.states.move_to_end(mint)
+            return st
+        st = self.states[mint] = MintState(mint, since_ms or int(time.time() * 1000))
+        while len(self.states) > self.max_mints:
+            await self.untrack(next(iter(self.states)))
+        await pumpportal.want(_METHOD, [mint])
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return st
+
+    async def untrack(self, mint: str):
+        if self.states.pop(mint, None) is not None:
+            await pumpportal.unwant(_METHOD, [mint])
+
+    def _on_tx(self, st: MintState, ev: TradeEvent, need_slot: bool, need_fee: bool, tx: Optional[dict]):
+        if not tx or self.states.get(st.mint) is not st:
+            return
+        if need_slot and tx.get("slot") is not None:
+            st.add_slot(int(tx["slot"]), ev.trader)
+        fee = (tx.get("meta") or {}).get("fee")
+        if need_fee and fee is not None:
+            st.add_fee(int(fee) / 1e9, ev.signature)
+
+    async def _sweep(self):
+        cutoff = time.time() * 1000 - self.ttl_ms
+        for mint in [m for m, st in self.states.items() if st.since_ms < cutoff]:
+            await self.untrack(mint)
+
+    async def _run(self):
+        sub = bus.subscribe(TradeEvent, where=lambda ev: ev.mint in self.states)
+        bus.start(pumpportal.name)
+        next_sweep = time.time() + 60
+        try:
+            while self.states:
+                try:
+                    ev: TradeEvent = await asyncio.wait_for(sub.get(), timeout=30)
+                except asyncio.TimeoutError:
+                    ev = None
+                if ev is not None:
+                    st = self.states.get(ev.mint)
+                    if st is not None:
+                        st.apply(ev)
+                        need_slot = ev.slot is None
+                        need_fee = ev.fee_sol is None and ev.signature not in st.fee_sigs
+                        if self.resolve_tx and (need_slot or need_fee):
+                            on_transaction(ev.signature, lambda tx, st=st, ev=ev, a=need_slot, b=need_fee:
+                                           self._on_tx(st, ev, a, b, tx))
+                if time.time() >= next_sweep:
+                    next_sweep = time.time() + 60
+                    await self._sweep()
+        finally:
+            sub.close()
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+tracker = TradeTracker(CONFIG["TRACKER_MAX_MINTS"], CONFIG["TRACKER_TTL_SEC"], CONFIG["TRACKER_RESOLVE_TX"])
+
+
+@on_shutdown
+async def stop_tracker():
+    await tracker.stop()
@@ -0,0 +1,68 @@
+# tests/bundler_bench.py
+# 合成数据对比 bundler 比例的纯 Python 路径和 NumPy 路径（结果必须一致）。
+#   python -m tests.bundler_bench --events 100000 500000
+import time
+import random
+from typing import List, Tuple
+
+import numpy as np
+
+from pumpbot.metrics.bundler import _count_bundlers_np, _count_bundlers_py
+
+
+def synth(n_events: int, seed: int) -> Tuple[List[int], List[int], int]:
+    """类似迁移后几小时的 EAP 数据：少量钱包很活跃，部分 slot 被一组钱包同时打（bundle）。"""
+    rnd = random.Random(seed)
+    n_wallets = max(10, n_events // 8)
+    n_slots = max(10, n_events // 3)
+    base = 300_000_000
+    slots: List[int] = []
+    signers: List[int] = []
+    while len(slots) < n_events:
+        slot = base + rnd.randrange(n_slots)
+        if rnd.random() < 0.1:
+            group = rnd.sample(range(n_wallets), rnd.randint(4, 12))
+        else:
+            group = [min(n_wallets - 1, int(rnd.paretovariate(1.2))) if rnd.random() < 0.3 else rnd.randrange(n_wallets)]
+        for w in group:
+            slots.append(slot)
+            signers.append(w)
+    return slots[:n_events], signers[:n_events], n_wallets
+
+
+def bench(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main(sizes: List[int], repeat: int, seed: int):
+    for n in sizes:
+        slots, signers, n_wallets = synth(n, seed)
+        s_arr, w_arr = np.asarray(slots, dtype=np.int64), np.asarray(signers, dtype=np.int32)
+        py = _count_bundlers_py(slots, signers)
+        vec = _count_bundlers_np(s_arr, w_arr, n_wallets)
+        assert py == vec, (py, vec)
+
+        t_py = bench(lambda: _count_bundlers_py(slots, signers), repeat)
+        t_np = bench(lambda: _count_bundlers_np(s_arr, w_arr, n_wallets), repeat)
+        # 含 list → ndarray 的转换（calc_bundlers_ratio_eap 实际走的路径）
+        t_np_conv = bench(lambda: _count_bundlers_np(np.asarray(slots, dtype=np.int64),
+                                                      np.asarray(signers, dtype=np.int32), n_wallets), repeat)
+        print(f"events={n:>8,}  bundlers={py[0]:>6}  bundled_slots={py[1]:>6}  "
+              f"python={t_py * 1000:8.1f}ms  numpy={t_np * 1000:7.1f}ms  numpy+convert={t_np_conv * 1000:7.1f}ms  "
+              f"speedup={t_py / t_np:5.1f}x")
+
+
+if __name__ == "__main__":
+    import argparse
+    p = argparse.ArgumentParser()
+    p.add_argument("--events", type=int, nargs="+", default=[100_000, 500_000])
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--seed", type=int, default=7)
+    args = p.parse_args()
+
+    main(args.events, args.repeat, args.seed)
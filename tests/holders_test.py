@@ -1,19 +1,17 @@
 import asyncio
-from pumpbot.chain.rpc import get_client
+from pumpbot.chain.rpc import acquire_client
+from pumpbot.util.lifecycle import running
 from pumpbot.util.notify import notify_serverchan
 from pumpbot.metrics.holders import compute_top_ratio
 
 async def main(mint: str, push: bool = True):
-    client = get_client()
-    try:
+    async with running(), acquire_client() as client:
         ratio = await compute_top_ratio(client, mint)  # returns 0..1 or None
         pct = None if ratio is None else round(ratio * 100, 2)
         txt = f"Mint: {mint}\nTop10 Holder Ratio: {pct}%"
         print(txt)
         if push:
             await notify_serverchan(f"[HOLDERS TEST] {mint[:6]}...{mint[-4:]}", txt.replace('\n', '\n\n'))
-    finally:
-        await client.close()
 
 if __name__ == "__main__":
     import argparse
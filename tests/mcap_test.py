@@ -1,15 +1,16 @@
 import asyncio
-from pumpbot.chain.rpc import get_client
+from pumpbot.chain.rpc import acquire_client
+from pumpbot.util.lifecycle import running
 from pumpbot.metrics.mcap import fast_mcap_usd, get_total_supply_ui
 from pumpbot.dex.dexscreener import get_token_pair_from_dexscreener
 from pumpbot.util.notify import notify_serverchan
 
 
 async def main(mint: str, push: bool = True):
-    client = get_client()
-    mcap, price = await fast_mcap_usd(client, mint)
-    supply, dec = await get_total_supply_ui(client, mint)
-    pair = await get_token_pair_from_dexscreener(mint)
+    async with running(), acquire_client() as client:
+        mcap, price = await fast_mcap_usd(client, mint)
+        supply, dec = await get_total_supply_ui(client, mint)
+        pair = await get_token_pair_from_dexscreener(mint)
     pair_addr = (pair or {}).get("pairAddress")
     created_ms = (pair or {}).get("pairCreatedAt")
     txt = (
@@ -23,7 +24,6 @@ async def main(mint: str, push: bool = True):
     print(txt)
     if push:
         await notify_serverchan(f"[MCAP TEST] {mint[:6]}...{mint[-4:]}", txt.replace("\n","\n\n"))
-    await client.close()
 
 
 if __name__ == "__main__":
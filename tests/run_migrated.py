@@ -2,6 +2,12 @@ import os
 import asyncio
 import argparse
 from pumpbot.watchers.migrated import listen_migrated
+from pumpbot.util.lifecycle import running
+
+
+async def main(minutes, max_items, push: bool):
+    async with running():
+        await listen_migrated(minutes=minutes, max_items=max_items, push=push)
 
 
 if __name__ == "__main__":
@@ -15,4 +21,4 @@ if __name__ == "__main__":
 
     minutes = None if args.minutes <= 0 else args.minutes
     max_items = None if args.max_items <= 0 else args.max_items
-    asyncio.run(listen_migrated(minutes=minutes, max_items=max_items, push=not args.no_push))
+    asyncio.run(main(minutes, max_items, push=not args.no_push))
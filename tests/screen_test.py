@@ -0,0 +1,22 @@
+import asyncio
+from pumpbot.util.lifecycle import running
+from pumpbot.detectors.migration import handle_migration
+
+
+async def main(mint: str, push: bool = True):
+    async with running():
+        out = await handle_migration(mint, push=push)
+    print(f"passed={out.passed} rejected_by={out.rejected_by}")
+    print(f"checks={out.checks}")
+    print(f"timings_ms={out.timings_ms} cancelled={out.cancelled}")
+    if out.errors:
+        print(f"errors={out.errors}")
+
+
+if __name__ == "__main__":
+    import argparse
+    p = argparse.ArgumentParser()
+    p.add_argument("--mint", required=True)
+    p.add_argument("--no-push", action="store_true")
+    args = p.parse_args()
+    asyncio.run(main(args.mint, push=not args.no_push))